@@ -0,0 +1,81 @@
+"""
+Measures how long the update loop takes to fetch the difference of
+every gapped channel, with ``channel_diff_concurrency`` requests in
+flight, compared against fetching them one at a time.
+
+A fake `__call__` answers each ``GetChannelDifferenceRequest`` after
+some latency. Checks that every channel was caught up, that there was
+never more than one request per channel, and never more requests than
+allowed.
+
+Usage: python benchmarks/channel_diff.py [latency_ms] [N ...]
+"""
+import asyncio
+import sys
+import time
+
+from telethon import TelegramClient
+from telethon._updates import Entity, EntityType
+from telethon._updates.messagebox import State, next_updates_deadline
+from telethon.tl import types
+
+CONCURRENCY = (1, 10, 50)
+
+
+class FakeClient(TelegramClient):
+    def __init__(self, latency, concurrency):
+        super().__init__(None, 1, 'x', channel_diff_concurrency=concurrency, receive_updates=False)
+        self.latency = latency
+        self.in_flight = set()
+        self.max_in_flight = 0
+
+    async def __call__(self, request, ordered=False, flood_sleep_threshold=None):
+        channel_id = request.channel.channel_id
+        assert channel_id not in self.in_flight, 'two requests for the same channel'
+        self.in_flight.add(channel_id)
+        self.max_in_flight = max(self.max_in_flight, len(self.in_flight))
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight.remove(channel_id)
+        return types.updates.ChannelDifferenceEmpty(pts=request.pts + 1, final=True)
+
+    def is_connected(self):
+        return True
+
+
+async def run(count, latency, concurrency):
+    client = FakeClient(latency, concurrency)
+    client._loop = asyncio.get_running_loop()
+    box = client._message_box
+    for channel_id in range(1, count + 1):
+        box.map[channel_id] = State(pts=1, deadline=next_updates_deadline())
+        box.getting_diff_for.add(channel_id)
+        client._mb_entity_cache.put(Entity(EntityType.CHANNEL, channel_id, channel_id))
+
+    start = time.perf_counter()
+    task = asyncio.create_task(client._update_loop())
+    while any(isinstance(entry, int) for entry in box.getting_diff_for):
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert all(box.map[i].pts == 2 for i in range(1, count + 1)), 'a channel was not caught up'
+    assert client.max_in_flight <= concurrency, 'too many requests in flight'
+    return elapsed
+
+
+async def main(latency, counts):
+    for count in counts:
+        timings = []
+        for concurrency in CONCURRENCY:
+            timings.append('{:.2f}s ({})'.format(await run(count, latency, concurrency), concurrency))
+        print('{} gapped channels: {}'.format(count, '  '.join(timings)))
+
+
+if __name__ == '__main__':
+    asyncio.run(main(
+        int(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.01,
+        list(map(int, sys.argv[2:])) or (10, 100, 1000),
+    ))
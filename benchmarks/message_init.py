@@ -0,0 +1,79 @@
+"""
+Measures the per-message cost of `Message._finish_init` in a history
+scan, like `iter_messages` does it (one entities map per batch).
+
+Runs the scan reading none of the entities, only the sender, or all
+of them, and prints the best time out of several runs as well as the
+allocations each message keeps alive afterwards.
+
+Usage: python benchmarks/message_init.py [messages]
+"""
+import datetime
+import gc
+import sys
+import time
+import tracemalloc
+
+from telethon import TelegramClient, types, utils
+from telethon.extensions import BinaryReader
+from telethon.sessions import MemorySession
+
+RUNS = 15
+
+
+def build(count):
+    now = datetime.datetime.now()
+    users = [types.User(id=i, access_hash=i, first_name='u%d' % i) for i in range(1, 101)]
+    chat = types.Channel(id=555, title='c', photo=types.ChatPhotoEmpty(), date=now, access_hash=5)
+    raw = [bytes(types.Message(
+        i, types.PeerChannel(555), now, 'hello',
+        from_id=types.PeerUser(1 + i % 100),
+        fwd_from=types.MessageFwdHeader(now, from_id=types.PeerUser(2)) if i % 10 == 0 else None,
+        reply_to=types.MessageReplyHeader(reply_to_msg_id=i - 1) if i % 3 == 0 else None
+    )) for i in range(count)]
+    return users + [chat], raw
+
+
+def scan(client, entities, input_chat, messages, touch):
+    entities = {utils.get_peer_id(x): x for x in entities}
+    for m in messages:
+        m._finish_init(client, entities, input_chat)
+        if touch == 'sender':
+            m.sender
+        elif touch == 'all':
+            m.sender, m.chat, m.forward, m.input_sender
+
+
+def main(count):
+    client = TelegramClient(MemorySession(), 1, 'x')
+    input_chat = types.InputPeerChannel(555, 5)
+    entities, raw = build(count)
+
+    def load():
+        return [BinaryReader(b).tgread_object() for b in raw]
+
+    gc.disable()
+    for touch in (None, 'sender', 'all'):
+        best = float('inf')
+        for _ in range(RUNS):
+            messages = load()
+            start = time.perf_counter()
+            scan(client, entities, input_chat, messages, touch)
+            best = min(best, time.perf_counter() - start)
+
+        messages = load()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        scan(client, entities, input_chat, messages, touch)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        diff = after.compare_to(before, 'filename')
+        print('touch={:<6} {:5.1f} ms, {:.1f} allocations ({:.0f} bytes) kept per message'.format(
+            str(touch), best * 1000,
+            sum(d.count_diff for d in diff) / count,
+            sum(d.size_diff for d in diff) / count))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,136 @@
+"""
+Micro-benchmark for the peer conversions in `telethon.utils`.
+
+Times `get_input_peer`, `get_input_user`, `get_input_channel`, `get_peer`
+and `get_peer_id` for every kind of peer, entity and input entity (as
+well as ints, strings and `None`), and prints nanoseconds per call.
+
+With ``check``, it prints what every call returns (or raises) instead,
+so that the output of two versions of the library can be diffed.
+
+Usage: python benchmarks/peer_utils.py [check | NAME ...]
+"""
+import datetime
+import sys
+import time
+
+from telethon import types, utils
+
+CALLS = 2000
+RUNS = 5
+
+_now = datetime.datetime(2020, 1, 1)
+_input_user = types.InputPeerUser(5, 7)
+
+OBJECTS = {
+    'User': types.User(id=5, access_hash=7, first_name='a'),
+    'User(self)': types.User(id=5, access_hash=7, is_self=True),
+    'User(min)': types.User(id=5, access_hash=7, min=True),
+    'User(nohash)': types.User(id=5),
+    'UserEmpty': types.UserEmpty(5),
+    'UserFull': types.UserFull(
+        id=5, settings=types.PeerSettings(), notify_settings=types.PeerNotifySettings(),
+        common_chats_count=0),
+    'Chat': types.Chat(77, 't', types.ChatPhotoEmpty(), 1, _now, 1),
+    'ChatEmpty': types.ChatEmpty(77),
+    'ChatForbidden': types.ChatForbidden(77, 't'),
+    'ChatFull': types.ChatFull(
+        77, 'a', types.ChatParticipantsForbidden(77), types.PeerNotifySettings()),
+    'Channel': types.Channel(
+        id=555, title='c', photo=types.ChatPhotoEmpty(), date=_now, access_hash=9),
+    'Channel(min)': types.Channel(
+        id=555, title='c', photo=types.ChatPhotoEmpty(), date=_now, access_hash=9, min=True),
+    'ChannelForbidden': types.ChannelForbidden(555, 9, 'c'),
+    'ChannelFull': types.ChannelFull(
+        id=555, about='a', read_inbox_max_id=0, read_outbox_max_id=0, unread_count=0,
+        chat_photo=types.PhotoEmpty(0), notify_settings=types.PeerNotifySettings(),
+        bot_info=[], pts=0),
+    'PeerUser': types.PeerUser(5),
+    'PeerChat': types.PeerChat(77),
+    'PeerChannel': types.PeerChannel(555),
+    'PeerChat(marked)': types.PeerChat(-77),
+    'InputPeerUser': _input_user,
+    'InputPeerChat': types.InputPeerChat(77),
+    'InputPeerChannel': types.InputPeerChannel(555, 9),
+    'InputPeerSelf': types.InputPeerSelf(),
+    'InputPeerEmpty': types.InputPeerEmpty(),
+    'InputPeerUserFromMessage': types.InputPeerUserFromMessage(_input_user, 1, 5),
+    'InputPeerChannelFromMessage': types.InputPeerChannelFromMessage(_input_user, 1, 555),
+    'InputUser': types.InputUser(5, 7),
+    'InputUserSelf': types.InputUserSelf(),
+    'InputUserEmpty': types.InputUserEmpty(),
+    'InputUserFromMessage': types.InputUserFromMessage(_input_user, 1, 5),
+    'InputChannel': types.InputChannel(555, 9),
+    'InputChannelEmpty': types.InputChannelEmpty(),
+    'InputChannelFromMessage': types.InputChannelFromMessage(_input_user, 1, 555),
+    'ResolvedPeer': types.contacts.ResolvedPeer(types.PeerUser(5), [], []),
+    'Dialog': types.Dialog(types.PeerChannel(555), 1, 1, 1, 0, 0, 0, types.PeerNotifySettings()),
+    'DialogPeer': types.DialogPeer(types.PeerUser(5)),
+    'TopPeer': types.TopPeer(types.PeerChat(77), 1.0),
+    'ChatParticipant': types.ChatParticipant(5, 1, _now),
+    'ChannelParticipant': types.ChannelParticipant(5, _now),
+    'ChannelParticipantLeft': types.ChannelParticipantLeft(types.PeerUser(5)),
+    'Message': types.Message(1, types.PeerUser(5), _now, 'x'),
+    'int': -1000000000555,
+    'str': 'hello',
+    'None': None,
+}
+
+FUNCTIONS = {
+    'get_input_peer': utils.get_input_peer,
+    'get_input_user': utils.get_input_user,
+    'get_input_channel': utils.get_input_channel,
+    'get_peer': utils.get_peer,
+    'get_peer_id': utils.get_peer_id,
+}
+
+# Variants only used to check that the behaviour didn't change
+CHECK_FUNCTIONS = dict(FUNCTIONS, **{
+    'get_peer_id(add_mark=False)': lambda x: utils.get_peer_id(x, add_mark=False),
+    'get_input_peer(allow_self=False, check_hash=False)':
+        lambda x: utils.get_input_peer(x, allow_self=False, check_hash=False),
+})
+
+
+def _describe(f, obj):
+    try:
+        result = f(obj)
+    except Exception as e:
+        return '{}: {}'.format(type(e).__name__, e)
+    return str(result.to_dict()) if hasattr(result, 'to_dict') else repr(result)
+
+
+def check():
+    for name, obj in OBJECTS.items():
+        for fname, f in CHECK_FUNCTIONS.items():
+            print(name, fname, _describe(f, obj))
+
+
+def bench(names):
+    for fname, f in FUNCTIONS.items():
+        timings = []
+        for name, obj in OBJECTS.items():
+            if names and name not in names:
+                continue
+
+            best = float('inf')
+            for _ in range(RUNS):
+                start = time.perf_counter()
+                for _ in range(CALLS):
+                    try:
+                        f(obj)
+                    except Exception:
+                        pass
+                best = min(best, time.perf_counter() - start)
+            timings.append((name, best / CALLS * 1e9))
+
+        print('{} (total {:.0f} ns)'.format(fname, sum(ns for _, ns in timings)))
+        for name, ns in timings:
+            print('    {:<28} {:6.0f} ns'.format(name, ns))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['check']:
+        check()
+    else:
+        bench(set(sys.argv[1:]))
@@ -0,0 +1,54 @@
+"""
+Stress test for the possible-gap buffers of `MessageBox`.
+
+Feeds ``N`` updates of one channel in shuffled batches, with the very
+first one arriving last, so that every update waits in a possible gap
+until then. Checks that all of them come out in order and that no gap
+is left behind, and prints how long it took.
+
+Usage: python benchmarks/possible_gaps.py [N ...]
+"""
+import logging
+import random
+import sys
+import time
+
+from telethon._updates import EntityCache, MessageBox, SessionState
+from telethon._updates.messagebox import State, epoch, next_updates_deadline
+from telethon.tl import types
+
+CHANNEL_ID = 77
+BATCH_SIZE = 10
+
+
+def update(pts):
+    message = types.Message(id=pts, peer_id=types.PeerChannel(CHANNEL_ID), date=None, message='x')
+    return types.UpdateNewChannelMessage(message, pts, 1)
+
+
+def run(count):
+    box = MessageBox(logging.getLogger(__name__))
+    box.load(SessionState(0, 0, False, 1, 0, 0, 0, None), [])
+    box.map[CHANNEL_ID] = State(pts=0, deadline=next_updates_deadline())
+
+    ids = list(range(2, count + 1))
+    random.Random(1).shuffle(ids)
+    ids.append(1)  # everything is a gap until the first update arrives
+
+    out = []
+    start = time.perf_counter()
+    for i in range(0, len(ids), BATCH_SIZE):
+        batch = types.Updates([update(pts) for pts in ids[i:i + BATCH_SIZE]], [], [], epoch(), 0)
+        result = []
+        box.process_updates(batch, EntityCache(), result)
+        out.extend(u.pts for u in result)
+    elapsed = time.perf_counter() - start
+
+    assert out == list(range(1, count + 1)), 'updates came out of order or were lost'
+    assert not box.possible_gaps, 'possible gaps were left behind'
+    print('N={}: {:.3f}s'.format(count, elapsed))
+
+
+if __name__ == '__main__':
+    for n in map(int, sys.argv[1:] or (2000, 10000)):
+        run(n)
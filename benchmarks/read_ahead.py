@@ -0,0 +1,97 @@
+"""
+Checks and times `iter_download` with ``read_ahead``, using a fake
+`_call` that behaves like ``upload.getFile`` with some latency.
+
+The fake server rejects requests whose ``limit`` does not divide 1MB or
+which cross a 1MB boundary, like Telegram does. For every request size
+and offset, the downloaded bytes must match the file, and the time is
+compared against downloading one request at a time.
+
+Request sizes that don't divide 1MB can't be used with read-ahead, so
+for those it checks that only one request is in flight at a time (the
+fake server accepts them in that case, to check the data too).
+
+Usage: python benchmarks/read_ahead.py [latency_ms]
+"""
+import asyncio
+import os
+import sys
+import time
+
+from telethon import TelegramClient, errors, types
+from telethon.sessions import MemorySession
+
+FILE_SIZE = 3 * 1024 * 1024 + 12345
+ONE_MB = 1024 * 1024
+
+
+class FakeClient(TelegramClient):
+    def __init__(self, data, latency):
+        super().__init__(MemorySession(), 1, 'x')
+        self.data = data
+        self.latency = latency
+        self.strict = True
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _call(self, sender, request, ordered=False, flood_sleep_threshold=None):
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if self.strict:
+            if ONE_MB % request.limit != 0:
+                raise errors.LimitInvalidError(request)
+            if request.offset % request.limit != 0 \
+                    or request.offset // ONE_MB != (request.offset + request.limit - 1) // ONE_MB:
+                raise errors.OffsetInvalidError(request)
+        return types.upload.File(
+            types.storage.FileUnknown(), 0, self.data[request.offset:request.offset + request.limit])
+
+
+async def download(client, offset, request_size, read_ahead):
+    location = types.InputDocumentFileLocation(1, 2, b'', '')
+    out = bytearray()
+    async for chunk in client.iter_download(
+            location, offset=offset, request_size=request_size,
+            file_size=len(client.data), read_ahead=read_ahead):
+        out += chunk
+    return bytes(out)
+
+
+async def main(latency):
+    data = os.urandom(FILE_SIZE)
+    client = FakeClient(data, latency)
+
+    for request_size in (128 * 1024, 512 * 1024):
+        for offset in (0, 4096, 1000, ONE_MB - 10):
+            timings = []
+            for read_ahead in (1, 4):
+                client.requests = 0
+                start = time.perf_counter()
+                got = await download(client, offset, request_size, read_ahead)
+                timings.append((time.perf_counter() - start, client.requests))
+                assert got == data[offset:], 'wrong data for request_size={} offset={} read_ahead={}'.format(
+                    request_size // 1024, offset, read_ahead)
+
+            print('request_size={:>3}KB offset={:>7}: {:.3f}s ({} requests) -> read_ahead=4 {:.3f}s ({} requests)'.format(
+                request_size // 1024, offset, *timings[0], *timings[1]))
+
+    client.strict = False
+    for request_size in (12 * 1024, 96 * 1024):
+        for offset in (0, 1000):
+            client.max_in_flight = 0
+            got = await download(client, offset, request_size, 4)
+            assert got == data[offset:], 'wrong data for request_size={} offset={}'.format(
+                request_size // 1024, offset)
+            assert client.max_in_flight == 1, 'read-ahead used for request_size={} offset={}'.format(
+                request_size // 1024, offset)
+            print('request_size={:>3}KB offset={:>7}: read-ahead not used'.format(request_size // 1024, offset))
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.005))
@@ -0,0 +1,89 @@
+"""
+Measures the memory and time needed to pack, encrypt and frame outgoing
+requests, like `MTProtoSender` does when uploading a file.
+
+Before measuring, it checks that the in-place path produces the same
+bytes as the copying one (AES-IGE, message encryption and TCP framing).
+
+Usage: python benchmarks/send_buffers.py [parts] [part_size_kb]
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+from telethon.crypto import AuthKey, AES, libssl
+from telethon.extensions.messagepacker import MessagePacker
+from telethon.network import mtprotostate
+from telethon.network.connection.tcpfull import FullPacketCodec
+from telethon.network.mtprotostate import MTProtoState
+from telethon.network.requeststate import RequestState
+from telethon.tl.functions import help, upload
+
+
+class _Loggers(dict):
+    def __missing__(self, key):
+        return logging.getLogger(key)
+
+
+def check_aes():
+    key, iv = os.urandom(32), os.urandom(32)
+    plain = bytearray(os.urandom(4096))
+    expected = AES.encrypt_ige(bytes(plain), key, iv)
+    AES.encrypt_ige_inplace(plain, key, iv)
+    assert bytes(plain) == expected, 'in-place AES-IGE differs'
+
+
+async def check_packing(state, packer):
+    # Same padding for both paths, so that their output can be compared
+    padding = os.urandom(64)
+    urandom = mtprotostate.os.urandom
+    mtprotostate.os.urandom = lambda n: padding[:n]
+    try:
+        packer.append(RequestState(help.GetConfigRequest()))
+        packer.append(RequestState(help.GetNearestDcRequest()))
+        _, data = await packer.get()
+        plain = bytes(data[40:])  # skip the room left for the encryption header
+        assert bytes(state.encrypt_message_buffer(data)) == state.encrypt_message_data(plain), \
+            'in-place encryption differs'
+    finally:
+        mtprotostate.os.urandom = urandom
+
+    codec = FullPacketCodec(None)
+    parts = codec.encode_packet_parts(bytearray(b'abcd'))
+    codec._send_counter = 0
+    assert b''.join(parts) == codec.encode_packet(b'abcd'), 'framing differs'
+
+
+async def main(count, part_size):
+    state = MTProtoState(AuthKey(os.urandom(256)), _Loggers())
+    packer = MessagePacker(state, _Loggers())
+    codec = FullPacketCodec(None)
+
+    check_aes()
+    await check_packing(state, packer)
+
+    part = os.urandom(part_size)
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(count):
+        packer.append(RequestState(upload.SaveBigFilePartRequest(
+            file_id=1, file_part=i, file_total_parts=count, bytes=part)))
+        _, data = await packer.get()
+        codec.encode_packet_parts(state.encrypt_message_buffer(data))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print('libssl in-place AES: {}'.format(bool(libssl.encrypt_ige_inplace)))
+    print('{} parts of {} KB: peak {:.1f} KB ({:.2f}x a part), {:.2f} ms per part'.format(
+        count, part_size // 1024, peak / 1024, peak / part_size, elapsed / count * 1000))
+
+
+if __name__ == '__main__':
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        int(sys.argv[2]) * 1024 if len(sys.argv) > 2 else 512 * 1024,
+    ))
@@ -18,6 +18,8 @@ to get the difference.
 """
 import asyncio
 import datetime
+import heapq
+import itertools
 import time
 import logging
 from enum import Enum
@@ -145,17 +147,33 @@ class State:
 #
 # This is really easy to trigger by spamming messages in a channel (with as little as 3 members works), because
 # the updates produced by the RPC request take a while to arrive (whereas the read update comes faster alone).
+#
+# The pending updates are kept in a heap ordered by the `pts` they start from (`pts - pts_count`),
+# so that the ones which can be applied next are always found first.
 class PossibleGap:
-    __slots__ = ('deadline', 'updates')
+    __slots__ = ('deadline', 'updates', '_counter')
 
     def __init__(
         self,
         deadline: float,
         # Pending updates (those with a larger PTS, producing the gap which may later be filled).
-        updates: list  # of updates
+        updates: list  # heap of (start pts, insertion order, update)
     ):
         self.deadline = deadline
         self.updates = updates
+        self._counter = itertools.count()
+
+    # Store an update which could not be applied yet.
+    def push(self, update, pts):
+        heapq.heappush(self.updates, (pts.pts - pts.pts_count, next(self._counter), update))
+
+    # The `pts` from which the next pending update starts.
+    def next_start(self):
+        return self.updates[0][0]
+
+    # Remove and return the update which starts from the lowest `pts`.
+    def pop(self):
+        return heapq.heappop(self.updates)[2]
 
     def __repr__(self):
         return f'PossibleGap(deadline={self.deadline}, update_count={len(self.updates)})'
@@ -474,23 +492,25 @@ class MessageBox:
             if __debug__:
                 self._trace('Trying to re-apply %r possible gaps', len(self.possible_gaps))
 
-            # For each update in possible gaps, see if the gap has been resolved already.
-            for key in list(self.possible_gaps.keys()):
-                self.possible_gaps[key].updates.sort(key=_sort_gaps)
-
-                for _ in range(len(self.possible_gaps[key].updates)):
-                    update = self.possible_gaps[key].updates.pop(0)
-
-                    # If this fails to apply, it will get re-inserted at the end.
-                    # All should fail, so the order will be preserved (it would've cycled once).
-                    update = self.apply_pts_info(update, reset_deadlines=None)
+            # For each possible gap, apply the pending updates for as long as they follow the local pts.
+            # Those starting before it were already handled (and are dropped by `apply_pts_info`), and
+            # once one starts after it, so will all the rest, so the gap is still there.
+            for entry in list(self.possible_gaps.keys()):
+                gap = self.possible_gaps[entry]
+                while gap.updates:
+                    state = self.map.get(entry)
+                    if state and gap.next_start() > state.pts:
+                        break
+
+                    update = self.apply_pts_info(gap.pop(), reset_deadlines=None)
                     if update:
                         result.append(update)
                         if __debug__:
                             self._trace('Resolved gap with %r: %s', PtsInfo.from_update(update), update)
 
-            # Clear now-empty gaps.
-            self.possible_gaps = {entry: gap for entry, gap in self.possible_gaps.items() if gap.updates}
+                # Clear now-empty gaps.
+                if not gap.updates:
+                    self.possible_gaps.pop(entry, None)
 
         real_result.extend(u for u in result if not u._self_outgoing)
 
@@ -563,7 +583,7 @@ class MessageBox:
                         updates=[]
                     )
 
-                self.possible_gaps[pts.entry].updates.append(update)
+                self.possible_gaps[pts.entry].push(update, pts)
                 return None
             else:
                 # Apply
@@ -720,11 +740,14 @@ class MessageBox:
     # region Getting and applying channel difference.
 
     # Return the request that needs to be made to get a channel's difference, if any.
+    #
+    # Channels in `exclude` are skipped (used when their difference is already being fetched).
     def get_channel_difference(
         self,
         chat_hashes,
+        exclude=(),
     ):
-        entry = next((id for id in self.getting_diff_for if isinstance(id, int)), None)
+        entry = next((id for id in self.getting_diff_for if isinstance(id, int) and id not in exclude), None)
         if not entry:
             return None
 
@@ -552,6 +552,8 @@ class AuthMethods:
         self._authorized = False
 
         await self.disconnect()
+        # Forget the key (and with it, those exported) in case the session is reused
+        self.session.auth_key = None
         await utils.maybe_async(self.session.delete())
         self.session = None
         return True
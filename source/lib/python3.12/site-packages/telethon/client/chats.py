@@ -50,6 +50,7 @@ class _ChatAction:
         self._auto_cancel = auto_cancel
         self._request = None
         self._task = None
+        self._call = None
         self._running = False
 
     async def __aenter__(self):
@@ -62,11 +63,16 @@ class _ChatAction:
             self._chat, self._action)
 
         self._running = True
-        self._task = self._client.loop.create_task(self._update())
+        self._refresh()
         return self
 
     async def __aexit__(self, *args):
+        was_running = self._running
         self._running = False
+        if self._call:
+            self._call.cancel()
+            self._call = None
+
         if self._task:
             self._task.cancel()
             try:
@@ -76,20 +82,28 @@ class _ChatAction:
 
             self._task = None
 
+        if was_running and self._auto_cancel:
+            await self._client(functions.messages.SetTypingRequest(
+                self._chat, types.SendMessageCancelAction()))
+
     __enter__ = helpers._sync_enter
     __exit__ = helpers._sync_exit
 
+    def _refresh(self):
+        # Called by the client's scheduler every `delay` seconds, which
+        # means no task is kept around while we wait to send it again.
+        self._call = None
+        self._task = self._client.loop.create_task(self._update())
+
     async def _update(self):
         try:
-            while self._running:
-                await self._client(self._request)
-                await asyncio.sleep(self._delay)
+            await self._client(self._request)
         except ConnectionError:
-            pass
-        except asyncio.CancelledError:
-            if self._auto_cancel:
-                await self._client(functions.messages.SetTypingRequest(
-                    self._chat, types.SendMessageCancelAction()))
+            self._running = False
+            return
+
+        if self._running:
+            self._call = self._client._scheduler.call_later(self._delay, self._refresh)
 
     def progress(self, current, total):
         if hasattr(self._action, 'progress'):
@@ -1,12 +1,16 @@
 import datetime
 import io
+import mmap
 import os
 import pathlib
 import typing
 import inspect
 import asyncio
+import collections
+import copy
 
 from ..crypto import AES
+from ..mediacache import MediaCache
 
 from .. import utils, helpers, errors, hints
 from ..requestiter import RequestIter
@@ -27,15 +31,67 @@ MAX_CHUNK_SIZE = 512 * 1024
 # 2021-01-15, users reported that `errors.TimeoutError` can occur while downloading files.
 TIMED_OUT_SLEEP = 1
 
+# Output objects which are filled in-place rather than written to
+_BUFFER_TYPES = (bytearray, memoryview, mmap.mmap)
+
 
 class _CdnRedirect(Exception):
     def __init__(self, cdn_redirect=None):
         self.cdn_redirect = cdn_redirect
       
   
+class _BufferWriter:
+    """
+    File-like wrapper to download into a buffer, copying each
+    part directly to its offset without any intermediate object.
+    """
+    def __init__(self, buffer, grow=False):
+        # Only a `bytearray` made for the download may grow (if the file
+        # size was not known). The buffers of the caller must fit the file.
+        self.buffer = buffer
+        self.pos = 0
+        self._grow = grow
+        self._view = buffer if grow else memoryview(buffer).cast('B')
+
+    @classmethod
+    def new(cls, size=0):
+        return cls(bytearray(size), grow=True)
+
+    def write(self, data):
+        end = self.pos + len(data)
+        if end > len(self._view) and not self._grow:
+            raise ValueError('the buffer is too small to hold the file ({} bytes)'
+                             .format(len(self._view)))
+        self._view[self.pos:end] = data
+        self.pos = end
+
+    def tell(self):
+        return self.pos
+
+    def getvalue(self):
+        """
+        Returns the new `bytearray` (with only what was written),
+        or the buffer of the caller as-is.
+        """
+        if self._grow:
+            del self.buffer[self.pos:]
+        return self.buffer
+
+    @classmethod
+    def fill(cls, file, data):
+        """
+        Writes all of ``data`` into ``file`` (the `bytearray` type or one of
+        `_BUFFER_TYPES`), returning what `download_media` should return.
+        """
+        f = cls.new(len(data)) if file is bytearray else cls(file)
+        f.write(data)
+        return f.getvalue()
+
+
 class _DirectDownloadIter(RequestIter):
     async def _init(
-            self, file, dc_id, offset, stride, chunk_size, request_size, file_size, msg_data, cdn_redirect=None):
+            self, file, dc_id, offset, stride, chunk_size, request_size, file_size, msg_data, cdn_redirect=None,
+            read_ahead=1, skip=0):
         self.request = functions.upload.GetFileRequest(
             file, offset=offset, limit=request_size) 
         self._client = self.client
@@ -49,15 +105,23 @@ class _DirectDownloadIter(RequestIter):
         self._chunk_size = chunk_size
         self._last_part = None
         self._msg_data = msg_data
-        self._timed_out = False
+        self._read_ahead = read_ahead
+        self._pending = collections.deque()
+        self._skip = skip
+        self._started = False
         
         self._exported = dc_id and self._client.session.dc_id != dc_id
-        if not self._exported:
+        if not self._exported and cdn_redirect is None and self.client._bulk_connections:
+            # Keep the main connection free for other requests
+            self._sender = await self.client._borrow_exported_sender(
+                self.client.session.dc_id, bulk=True)
+            self._exported = True
+        elif not self._exported:
             # The used sender will also change if ``FileMigrateError`` occurs
             self._sender = self.client._sender
         else:
             try:
-                self._sender = await self.client._borrow_exported_sender(dc_id)
+                self._sender = await self.client._borrow_exported_sender(dc_id, bulk=True)
             except errors.DcIdInvalidError:
                 # Can't export a sender for the ID we are currently in
                 config = await self.client(functions.help.GetConfigRequest())
@@ -76,54 +140,101 @@ class _DirectDownloadIter(RequestIter):
                 self._exported = False
 
     async def _load_next_chunk(self):
-        cur = await self._request()
-        self.buffer.append(cur)
+        # The first request is made alone, in case the sender needs to change
+        if self._read_ahead > 1 and self._started:
+            cur = await self._request_ahead()
+        else:
+            cur = await self._request()
+            self._started = True
+
+        if self._skip:
+            self.buffer.append(cur[self._skip:])
+            self._skip = 0
+        else:
+            self.buffer.append(cur)
+
         if len(cur) < self.request.limit:
             self.left = len(self.buffer)
             await self.close()
         else:
             self.request.offset += self._stride
 
-    async def _request(self):
+    async def _request_ahead(self):
+        # Keep up to ``read_ahead`` requests in flight for the next chunks,
+        # but not past the end of the file (if known) or the chunks left.
+        offset = self.request.offset + len(self._pending) * self._stride
+        while len(self._pending) < min(self._read_ahead, self.left) and (
+                not self._pending or self.total is None or offset < self.total):
+            request = copy.copy(self.request)
+            request.offset = offset
+            self._pending.append(helpers.get_running_loop().create_task(self._request(request)))
+            offset += self._stride
+
+        try:
+            return await self._pending.popleft()
+        except BaseException:
+            # Nothing else will be read, so don't leave the rest running
+            await self._cancel_pending()
+            raise
+
+    async def _cancel_pending(self):
+        pending = list(self._pending)
+        self._pending.clear()
+        for task in pending:
+            task.cancel()
+        # Retrieve their results so that they're not logged as never retrieved
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _request(self, request=None, timed_out=False):
+        if request is None:
+            request = self.request
+
         try:
-            result = await self._client._call(self._sender, self.request)
-            self._timed_out = False
+            result = await self._client._call(self._sender, request)
             if isinstance(result, types.upload.FileCdnRedirect):
                 if self.client._mb_entity_cache.self_bot:
                     raise ValueError('FileCdnRedirect but the GetCdnFileRequest API access for bot users is restricted. Try to change api_id to avoid FileCdnRedirect')
                 raise _CdnRedirect(result)
             if isinstance(result, types.upload.CdnFileReuploadNeeded):
                 await self.client._call(self.client._sender, functions.upload.ReuploadCdnFileRequest(file_token=self._cdn_redirect.file_token, request_token=result.request_token))
-                result = await self._client._call(self._sender, self.request)
+                result = await self._client._call(self._sender, request)
                 return result.bytes
             else:
                 return result.bytes
 
         except errors.TimedOutError as e:
-            if self._timed_out:
+            if timed_out:
                 self.client._log[__name__].warning('Got two timeouts in a row while downloading file')
                 raise
 
-            self._timed_out = True
             self.client._log[__name__].info('Got timeout while downloading file, retrying once')
             await asyncio.sleep(TIMED_OUT_SLEEP)
-            return await self._request()
+            return await self._request(request, timed_out=True)
 
         except errors.FileMigrateError as e:
             self.client._log[__name__].info('File lives in another DC')
-            self._sender = await self.client._borrow_exported_sender(e.new_dc)
+            previous, exported = self._sender, self._exported
+            self._sender = await self.client._borrow_exported_sender(e.new_dc, bulk=True)
             self._exported = True
-            return await self._request()
+            if exported:
+                await self.client._return_exported_sender(previous)
+            return await self._request(request)
 
         except (errors.FilerefUpgradeNeededError, errors.FileReferenceExpiredError) as e:
             # Only implemented for documents which are the ones that may take that long to download
             if not self._msg_data \
-                    or not isinstance(self.request.location, types.InputDocumentFileLocation) \
-                    or self.request.location.thumb_size != '':
+                    or not isinstance(request.location, types.InputDocumentFileLocation) \
+                    or request.location.thumb_size != '':
                 raise
 
             self.client._log[__name__].info('File ref expired during download; refetching message')
             chat, msg_id = self._msg_data
+            store = self.client._message_store
+            if store:
+                # The stored message has the same expired reference
+                store.delete_messages(
+                    self.client._mb_entity_cache.self_id, getattr(chat, 'channel_id', None), [msg_id])
+
             msg = await self.client.get_messages(chat, ids=msg_id)
 
             if not isinstance(msg.media, types.MessageMediaDocument):
@@ -132,13 +243,15 @@ class _DirectDownloadIter(RequestIter):
             document = msg.media.document
 
             # Message media may have been edited for something else
-            if document.id != self.request.location.id:
+            if document.id != request.location.id:
                 raise
 
-            self.request.location.file_reference = document.file_reference
-            return await self._request()
+            request.location.file_reference = document.file_reference
+            return await self._request(request)
 
     async def close(self):
+        await self._cancel_pending()
+
         if not self._sender:
             return
 
@@ -312,7 +425,7 @@ class DownloadMethods:
 
         try:
             result = await self.download_file(loc, file, dc_id=dc_id)
-            return result if file is bytes else file
+            return result if file is bytes or file is bytearray else file
         except errors.LocationInvalidError:
             # See issue #500, Android app fails as of v4.6.0 (1155).
             # The fix seems to be using the full channel chat photo.
@@ -356,6 +469,9 @@ class DownloadMethods:
                 and returned as a bytestring (i.e. ``file=bytes``, without
                 parentheses or quotes).
 
+                It may also be the `bytearray` type or a buffer to fill,
+                like in `download_file`.
+
             progress_callback (`callable`, optional):
                 A callback function accepting two parameters:
                 ``(received bytes, total)``.
@@ -482,13 +598,20 @@ class DownloadMethods:
                 If the file path is `None` or `bytes`, then the result
                 will be saved in memory and returned as `bytes`.
 
+                If it's a `bytearray`, `memoryview` or ``mmap`` (such as
+                one of a file already of the right size), the result is
+                stored directly into it and it is returned, or `ValueError`
+                is raised if it's too small. If it's the `bytearray` type,
+                a new one is returned instead.
+
             part_size_kb (`int`, optional):
                 Chunk size when downloading files. The larger, the less
                 requests will be made (up to 512KB maximum).
 
             file_size (`int`, optional):
                 The file size that is about to be downloaded, if known.
-                Only used if ``progress_callback`` is specified.
+                Used for ``progress_callback`` and when ``file`` is the
+                `bytearray` type.
 
             progress_callback (`callable`, optional):
                 A callback function accepting two parameters:
@@ -536,7 +659,8 @@ class DownloadMethods:
             key: bytes = None,
             iv: bytes = None,
             msg_data: tuple = None,
-            cdn_redirect: types.upload.FileCdnRedirect = None
+            cdn_redirect: types.upload.FileCdnRedirect = None,
+            cache_key: tuple = None
     ) -> typing.Optional[bytes]:
         if not part_size_kb:
             if not file_size:
@@ -552,9 +676,21 @@ class DownloadMethods:
         if isinstance(file, pathlib.Path):
             file = str(file.absolute())
 
+        # Encrypted files can't be resumed, since every part depends on the last
+        if self._media_cache and cache_key and not (key or iv or cdn_redirect):
+            path = await self._download_to_cache(
+                input_location, cache_key, part_size, file_size,
+                progress_callback, dc_id, msg_data)
+            if path is not None:
+                return await self._copy_from_cache(path, file)
+
         in_memory = file is None or file is bytes
         if in_memory:
             f = io.BytesIO()
+        elif file is bytearray:
+            f = _BufferWriter.new(file_size or 0)
+        elif isinstance(file, _BUFFER_TYPES):
+            f = _BufferWriter(file)
         elif isinstance(file, str):
             # Ensure that we'll be able to download the media
             helpers.ensure_parent_dir_exists(file)
@@ -580,7 +716,7 @@ class DownloadMethods:
             if callable(getattr(f, 'flush', None)):
                 f.flush()
 
-            if in_memory:
+            if in_memory or isinstance(f, _BufferWriter):
                 return f.getvalue()
         except _CdnRedirect as e:
           self._log[__name__].info('FileCdnRedirect to CDN data center %s', e.cdn_redirect.dc_id)
@@ -600,6 +736,82 @@ class DownloadMethods:
             if isinstance(file, str) or in_memory:
                 f.close()
 
+    async def _download_to_cache(
+            self: 'TelegramClient', input_location, cache_key, part_size,
+            file_size, progress_callback, dc_id, msg_data):
+        cache = self._media_cache
+        path = cache.get(cache_key)
+        if path is not None:
+            self._log[__name__].info('Using cached media for %s', cache_key)
+            if progress_callback:
+                r = progress_callback(os.path.getsize(path), file_size)
+                if inspect.isawaitable(r):
+                    await r
+            return path
+
+        started = cache.begin(cache_key, part_size)
+        if started is None:
+            # Someone else is downloading it, so it can't be resumed
+            return None
+
+        part_path, offset = started
+        if offset:
+            self._log[__name__].info('Resuming download of %s at %d', cache_key, offset)
+
+        done = False
+        try:
+            with open(part_path, 'ab') as f:
+                async for chunk in self._iter_download(
+                        input_location, offset=offset, request_size=part_size,
+                        dc_id=dc_id, msg_data=msg_data):
+                    f.write(chunk)
+                    if progress_callback:
+                        r = progress_callback(f.tell(), file_size)
+                        if inspect.isawaitable(r):
+                            await r
+            done = True
+        except _CdnRedirect:
+            # Files from CDNs are encrypted, so download those without cache
+            return None
+        finally:
+            cache.end(cache_key, done)
+
+        return cache.get(cache_key)
+
+    @staticmethod
+    async def _copy_from_cache(path, file):
+        if file is None or file is bytes:
+            with open(path, 'rb') as f:
+                return f.read()
+
+        if isinstance(file, str):
+            helpers.ensure_parent_dir_exists(file)
+            MediaCache.copy(path, file)
+            return None
+
+        if file is bytearray:
+            out = _BufferWriter.new(os.path.getsize(path))
+        elif isinstance(file, _BUFFER_TYPES):
+            out = _BufferWriter(file)
+        else:
+            out = file
+
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(MAX_CHUNK_SIZE)
+                if not chunk:
+                    break
+                r = out.write(chunk)
+                if inspect.isawaitable(r):
+                    await r
+
+        if isinstance(out, _BufferWriter):
+            return out.getvalue()
+
+        # Not all IO objects have flush (see #1227)
+        if callable(getattr(out, 'flush', None)):
+            out.flush()
+
     def iter_download(
             self: 'TelegramClient',
             file: 'hints.FileLike',
@@ -610,7 +822,8 @@ class DownloadMethods:
             chunk_size: int = None,
             request_size: int = MAX_CHUNK_SIZE,
             file_size: int = None,
-            dc_id: int = None
+            dc_id: int = None,
+            read_ahead: int = 1
     ):
         """
         Iterates over a file download, yielding chunks of the file.
@@ -671,6 +884,18 @@ class DownloadMethods:
                 The data center the library should connect to in order
                 to download the file. You shouldn't worry about this.
 
+            read_ahead (`int`, optional):
+                How many requests may be in flight at once for the next
+                chunks, which is useful to stream the file at a steady
+                rate. At most this many chunks are held in memory.
+
+                When used, the `offset` may be any value (for example, to
+                answer HTTP range requests), and the first chunk will be
+                shorter if the offset is not a multiple of `request_size`.
+                It only has effect if `stride` and `chunk_size` are left
+                as they are, and `request_size` divides 1MB (such as the
+                default). By default, one request is made at a time.
+
         Yields
 
             `bytes` objects representing the chunks of the file if the
@@ -694,6 +919,11 @@ class DownloadMethods:
                 header = await stream.__anext__()  # "manual" version of `async for`
                 await stream.close()
                 assert len(header) == 32
+
+                # Streaming from the middle of the file with 4 requests in flight
+                async with client.iter_download(media, offset=start, read_ahead=4) as stream:
+                    async for chunk in stream:
+                        await response.write(chunk)
         """
         return self._iter_download(
             file,
@@ -704,6 +934,7 @@ class DownloadMethods:
             request_size=request_size,
             file_size=file_size,
             dc_id=dc_id,
+            read_ahead=read_ahead,
         )
 
     def _iter_download(
@@ -718,7 +949,8 @@ class DownloadMethods:
             file_size: int = None,
             dc_id: int = None,
             msg_data: tuple = None,
-            cdn_redirect: types.upload.FileCdnRedirect = None
+            cdn_redirect: types.upload.FileCdnRedirect = None,
+            read_ahead: int = 1
     ):
         info = utils._get_file_info(file)
         if info.dc_id is not None:
@@ -746,7 +978,22 @@ class DownloadMethods:
         elif request_size > MAX_CHUNK_SIZE:
             request_size = MAX_CHUNK_SIZE
 
-        if chunk_size == request_size \
+        # With read-ahead, start at the previous valid offset and skip the rest.
+        # The requests must not cross a 1MB boundary, so the size has to divide it.
+        skip = 0
+        if read_ahead > 1 and chunk_size == request_size and stride == chunk_size \
+                and (MAX_CHUNK_SIZE * 2) % request_size == 0:
+            skip = offset % request_size
+            offset -= skip
+            cls = _DirectDownloadIter
+            self._log[__name__].info('Starting streamed file download in chunks of '
+                                     '%d at %d, %d in flight', request_size, offset, read_ahead)
+        elif read_ahead > 1:
+            read_ahead = 1
+            cls = _GenericDownloadIter
+            self._log[__name__].info('Starting indirect file download in chunks of '
+                                     '%d at %d, stride %d', request_size, offset, stride)
+        elif chunk_size == request_size \
                 and offset % MIN_CHUNK_SIZE == 0 \
                 and stride % MIN_CHUNK_SIZE == 0 \
                 and (limit is None or offset % limit == 0):
@@ -769,7 +1016,9 @@ class DownloadMethods:
             request_size=request_size,
             file_size=file_size,
             msg_data=msg_data,
-            cdn_redirect=cdn_redirect
+            cdn_redirect=cdn_redirect,
+            read_ahead=read_ahead,
+            skip=skip
         )
 
     # endregion
@@ -829,6 +1078,8 @@ class DownloadMethods:
 
         if file is bytes:
             return data
+        elif file is bytearray or isinstance(file, _BUFFER_TYPES):
+            return _BufferWriter.fill(file, data)
         elif isinstance(file, str):
             helpers.ensure_parent_dir_exists(file)
             f = open(file, 'wb')
@@ -868,7 +1119,7 @@ class DownloadMethods:
         else:
             file_size = size.size
 
-        result = await self.download_file(
+        result = await self._download_file(
             types.InputPhotoFileLocation(
                 id=photo.id,
                 access_hash=photo.access_hash,
@@ -877,9 +1128,10 @@ class DownloadMethods:
             ),
             file,
             file_size=file_size,
-            progress_callback=progress_callback
+            progress_callback=progress_callback,
+            cache_key=('photo', photo.id, size.type, photo.dc_id)
         )
-        return result if file is bytes else file
+        return result if file is bytes or file is bytearray else file
 
     @staticmethod
     def _get_kind_and_names(attributes):
@@ -940,9 +1192,10 @@ class DownloadMethods:
             file_size=size.size if size else document.size,
             progress_callback=progress_callback,
             msg_data=msg_data,
+            cache_key=('document', document.id, size.type if size else '', document.dc_id)
         )
 
-        return result if file is bytes else file
+        return result if file is bytes or file is bytearray else file
 
     @classmethod
     def _download_contact(cls, mm_contact, file):
@@ -972,6 +1225,8 @@ class DownloadMethods:
         )
         if file is bytes:
             return result
+        elif file is bytearray or isinstance(file, _BUFFER_TYPES):
+            return _BufferWriter.fill(file, result)
         f = file if hasattr(file, 'write') else open(file, 'wb')
 
         try:
@@ -1002,6 +1257,10 @@ class DownloadMethods:
         )
         if file is bytes:
             f = io.BytesIO()
+        elif file is bytearray:
+            f = _BufferWriter.new()
+        elif isinstance(file, _BUFFER_TYPES):
+            f = _BufferWriter(file)
         elif hasattr(file, 'write'):
             f = file
         else:
@@ -1018,10 +1277,11 @@ class DownloadMethods:
                             break
                         f.write(chunk)
         finally:
-            if f != file:
+            # Only close the file if we opened it
+            if isinstance(file, str):
                 f.close()
 
-        return f.getvalue() if file is bytes else file
+        return f.getvalue() if file is bytes or file is bytearray else file
 
     @staticmethod
     def _get_proper_filename(file, kind, extension,
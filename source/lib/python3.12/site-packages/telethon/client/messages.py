@@ -1,14 +1,22 @@
+import gzip
 import inspect
 import itertools
+import json
+import os
+import pathlib
 import typing
 import warnings
 
 from .. import helpers, utils, errors, hints
+from ..extensions import tljson
 from ..requestiter import RequestIter
-from ..tl import types, functions
+from ..tl import types, functions, custom
 
 _MAX_CHUNK_SIZE = 100
 
+# How many exported messages are written (and checkpointed) at once
+_EXPORT_BATCH_SIZE = 1000
+
 if typing.TYPE_CHECKING:
     from .telegramclient import TelegramClient
 
@@ -184,8 +192,12 @@ class _MessagesIter(RequestIter):
         r = await self.client(self.request)
         self.total = getattr(r, 'count', len(r.messages))
 
-        entities = {utils.get_peer_id(x): x
-                    for x in itertools.chain(r.users, r.chats)}
+        # Scheduled messages don't have their final ID yet
+        store = self.client._message_store
+        if store and not isinstance(self.request, functions.messages.GetScheduledHistoryRequest):
+            store.put_messages(self.client._mb_entity_cache.self_id, r.messages)
+
+        entities = self._get_entities(r)
 
         messages = reversed(r.messages) if self.reverse else r.messages
         for message in messages:
@@ -201,8 +213,7 @@ class _MessagesIter(RequestIter):
             # is an attempt to avoid these duplicates, since the message
             # IDs are returned in descending order (or asc if reverse).
             self.last_id = message.id
-            message._finish_init(self.client, entities, self.entity)
-            self.buffer.append(message)
+            self._add_message(message, entities)
 
         # Not a slice (using offset would return the same, with e.g. SearchGlobal).
         if isinstance(r, types.messages.Messages):
@@ -237,6 +248,14 @@ class _MessagesIter(RequestIter):
             # should just give up since there won't be any new Message.
             return True
 
+    def _get_entities(self, response):
+        return {utils.get_peer_id(x): x
+                for x in itertools.chain(response.users, response.chats)}
+
+    def _add_message(self, message, entities):
+        message._finish_init(self.client, entities, self.entity)
+        self.buffer.append(message)
+
     def _message_in_range(self, message):
         """
         Determine whether the given message is in the range or
@@ -281,6 +300,19 @@ class _MessagesIter(RequestIter):
             self.request.offset_rate = getattr(response, 'next_rate', 0)
 
 
+class _RawMessagesIter(_MessagesIter):
+    """
+    Like `_MessagesIter`, but the messages are left as they come from
+    the response (without a client or entities), for when only their
+    raw fields are needed.
+    """
+    def _get_entities(self, response):
+        return None
+
+    def _add_message(self, message, entities):
+        self.buffer.append(message)
+
+
 class _IDsIter(RequestIter):
     async def _init(self, entity, ids):
         self.total = len(ids)
@@ -289,18 +321,61 @@ class _IDsIter(RequestIter):
         self._entity = (await self.client.get_input_entity(entity)) if entity else None
         self._ty = helpers._entity_type(self._entity) if self._entity else None
 
+        # The messages already in the store don't need to be fetched
+        # (unless an ID is not a number, then they are all fetched).
+        # In channels, the message IDs belong to that channel alone.
+        store = self.client._message_store
+        self._stored = {}
+        if store and all(isinstance(i, int) for i in ids):
+            owner_id = self.client._mb_entity_cache.self_id
+            if self._ty == helpers._EntityType.CHANNEL:
+                self._stored = store.get_messages(owner_id, utils.get_peer_id(self._entity), ids)
+            else:
+                self._stored = store.get_messages(owner_id, None, ids)
+
         # 30s flood wait every 300 messages (3 requests of 100 each, 30 of 10, etc.)
         if self.wait_time is None:
-            self.wait_time = 10 if self.limit > 300 else 0
+            self.wait_time = 10 if self.limit - len(self._stored) > 300 else 0
 
     async def _load_next_chunk(self):
-        ids = self._ids[self._offset:self._offset + _MAX_CHUNK_SIZE]
+        # Take as many IDs as needed to have a full request of IDs not stored
+        ids = []
+        fetch = []
+        while self._offset < len(self._ids) and len(fetch) < _MAX_CHUNK_SIZE:
+            message_id = self._ids[self._offset]
+            self._offset += 1
+            ids.append(message_id)
+            if message_id not in self._stored:
+                fetch.append(message_id)
+
         if not ids:
             raise StopAsyncIteration
 
-        self._offset += _MAX_CHUNK_SIZE
-
         from_id = None  # By default, no need to validate from_id
+        if self._ty != helpers._EntityType.CHANNEL and self._entity:
+            from_id = await self.client._get_peer(self._entity)
+
+        messages = await self._fetch(fetch, from_id) if fetch else []
+        if len(fetch) == len(ids):
+            self.buffer.extend(messages)
+            return
+
+        # Stored messages may belong to any chat but channels, so they're
+        # validated the same way. Their entities come from the cache.
+        from_id = from_id and utils.get_peer_id(from_id)
+        fetched = {m.id: m for m in messages if m}
+        for message_id in ids:
+            message = fetched.get(message_id)
+            if message_id in self._stored:
+                chat_id, message = self._stored[message_id]
+                if from_id and chat_id != from_id:
+                    message = None
+                else:
+                    message._finish_init(self.client, {}, self._entity)
+
+            self.buffer.append(message)
+
+    async def _fetch(self, ids, from_id):
         if self._ty == helpers._EntityType.CHANNEL:
             try:
                 r = await self.client(
@@ -310,12 +385,13 @@ class _IDsIter(RequestIter):
                 r = types.messages.MessagesNotModified(len(ids))
         else:
             r = await self.client(functions.messages.GetMessagesRequest(ids))
-            if self._entity:
-                from_id = await self.client._get_peer(self._entity)
 
         if isinstance(r, types.messages.MessagesNotModified):
-            self.buffer.extend(None for _ in ids)
-            return
+            return [None for _ in ids]
+
+        store = self.client._message_store
+        if store:
+            store.put_messages(self.client._mb_entity_cache.self_id, r.messages)
 
         entities = {utils.get_peer_id(x): x
                     for x in itertools.chain(r.users, r.chats)}
@@ -328,13 +404,16 @@ class _IDsIter(RequestIter):
         # The passed message IDs may not belong to the desired entity
         # since the user can enter arbitrary numbers which can belong to
         # arbitrary chats. Validate these unless ``from_id is None``.
+        messages = []
         for message in r.messages:
             if isinstance(message, types.MessageEmpty) or (
                     from_id and message.peer_id != from_id):
-                self.buffer.append(None)
+                messages.append(None)
             else:
                 message._finish_init(self.client, entities, self._entity)
-                self.buffer.append(message)
+                messages.append(message)
+
+        return messages
 
 
 class MessageMethods:
@@ -606,6 +685,222 @@ class MessageMethods:
 
     get_messages.__signature__ = inspect.signature(iter_messages)
 
+    async def export_history(
+            self: 'TelegramClient',
+            entity: 'hints.EntityLike',
+            file: 'hints.OutFileLike',
+            *,
+            checkpoint: str = None,
+            compress: bool = None,
+            takeout: bool = False,
+            wait_time: float = None
+    ) -> int:
+        """
+        Exports the whole message history of the given chat as JSON lines,
+        from oldest to newest, with one raw :tl:`Message` per line.
+
+        Messages are encoded straight from the API objects as they are
+        fetched and written in batches, so the memory used stays the same
+        no matter how large the chat is. Each line has the same contents
+        as ``message.to_json()``, only without whitespace.
+
+        Arguments
+            entity (`entity`):
+                The chat to export.
+
+            file (`str` | `file`):
+                The output file path or binary stream-like object.
+                If the path exists, it will be overwritten (unless
+                the export is being resumed from a `checkpoint`).
+
+            checkpoint (`str`, optional):
+                Path to a small file where the progress is saved after
+                every batch. If it exists, the export resumes after the
+                last message that was saved, dropping anything written
+                to `file` after it. It can only be used if `file` is a path.
+
+            compress (`bool`, optional):
+                Whether the output should be compressed with gzip. If left
+                to `None`, it will be compressed if `file` ends with ``.gz``.
+
+            takeout (`bool`, optional):
+                Whether the export should be made through a takeout session
+                (see `takeout()`), which has higher limits. The takeout is
+                finished once the export is done. If a takeout is already
+                in progress, call this method on it instead.
+
+            wait_time (`int`):
+                Same as in `iter_messages()`. Defaults to no wait time
+                when using `takeout`.
+
+        Returns
+            The amount of messages exported by this call.
+
+        Example
+            .. code-block:: python
+
+                # Export a chat, resuming where it was left if interrupted
+                await client.export_history(
+                    chat, 'chat.jsonl.gz', checkpoint='chat.checkpoint')
+
+                # Read it back
+                import gzip, json
+                with gzip.open('chat.jsonl.gz', 'rt') as f:
+                    for line in f:
+                        print(json.loads(line)['message'])
+        """
+        if takeout:
+            async with self.takeout(
+                    users=True, chats=True, megagroups=True, channels=True) as client:
+                return await client.export_history(
+                    entity, file, checkpoint=checkpoint, compress=compress,
+                    wait_time=0 if wait_time is None else wait_time)
+
+        if isinstance(file, pathlib.Path):
+            file = str(file)
+
+        in_memory = not isinstance(file, str)
+        if checkpoint and in_memory:
+            raise ValueError('checkpoint can only be used when file is a path')
+
+        if compress is None:
+            compress = not in_memory and file.endswith('.gz')
+
+        last_id = offset = 0
+        if checkpoint and os.path.isfile(checkpoint) and os.path.isfile(file):
+            with open(checkpoint, encoding='utf-8') as fd:
+                state = json.load(fd)
+            last_id, offset = state['last_id'], state['offset']
+
+        if in_memory:
+            f = file
+        else:
+            f = open(file, 'r+b' if offset else 'wb')
+            f.seek(offset)
+            f.truncate()
+
+        count = 0
+        lines = []
+
+        def flush():
+            nonlocal offset
+            if not lines:
+                return
+
+            data = ''.join(lines).encode('ascii')  # the encoder escapes non-ASCII
+            lines.clear()
+            if compress:
+                # Every batch is its own gzip member, so that the file can be
+                # truncated after any of them. Readers will join all members.
+                with gzip.GzipFile(fileobj=f, mode='wb') as gz:
+                    gz.write(data)
+            else:
+                f.write(data)
+
+            if checkpoint:
+                f.flush()
+                os.fsync(f.fileno())
+                offset = f.tell()
+                with open(checkpoint + '.tmp', 'w', encoding='utf-8') as c:
+                    json.dump({'last_id': last_id, 'offset': offset}, c)
+                os.replace(checkpoint + '.tmp', checkpoint)
+
+        try:
+            async for message in self.iter_messages(
+                    entity, reverse=True, min_id=last_id, wait_time=wait_time):
+                lines.append(tljson.dumps(message))
+                lines.append('\n')
+                last_id = message.id
+                count += 1
+                if count % _EXPORT_BATCH_SIZE == 0:
+                    flush()
+
+            flush()
+        finally:
+            if not in_memory:
+                f.close()
+
+        return count
+
+    async def get_message_columns(
+            self: 'TelegramClient',
+            entity: 'hints.EntityLike',
+            limit: float = None,
+            *,
+            columns: 'custom.MessageColumns' = None,
+            offset_date: 'hints.DateLike' = None,
+            offset_id: int = 0,
+            max_id: int = 0,
+            min_id: int = 0,
+            add_offset: int = 0,
+            search: str = None,
+            filter: 'typing.Union[types.TypeMessagesFilter, typing.Type[types.TypeMessagesFilter]]' = None,
+            from_user: 'hints.EntityLike' = None,
+            wait_time: float = None,
+            reverse: bool = False,
+            reply_to: int = None,
+            scheduled: bool = False
+    ) -> 'custom.MessageColumns':
+        """
+        Same as `iter_messages()`, but only the metadata of the messages
+        is kept, as columns in a `MessageColumns
+        <telethon.tl.custom.messagecolumns.MessageColumns>`, instead of
+        returning a `Message <telethon.tl.custom.message.Message>` for each.
+
+        The messages are not finished with their chat and sender entities,
+        and only a few integers and their text are stored per message, so
+        this is a lot cheaper for analyzing large amounts of messages.
+        The columns can be turned into NumPy arrays if it's installed.
+
+        Arguments
+            columns (`MessageColumns <telethon.tl.custom.messagecolumns.MessageColumns>`, optional):
+                The columns to which the messages should be added. If left
+                to `None`, new columns will be created. This can be used to
+                add the messages from several calls or chats together.
+
+            The rest of arguments are the same as in `iter_messages()`,
+            except for `ids`, which is not supported.
+
+        Returns
+            The `MessageColumns <telethon.tl.custom.messagecolumns.MessageColumns>`.
+
+        Example
+            .. code-block:: python
+
+                columns = await client.get_message_columns(chat, None)
+                arrays = columns.to_numpy()
+                print(arrays['views'].mean())
+        """
+        if columns is None:
+            columns = custom.MessageColumns()
+
+        it = _RawMessagesIter(
+            client=self,
+            reverse=reverse,
+            wait_time=wait_time,
+            limit=limit,
+            entity=entity,
+            offset_id=offset_id,
+            min_id=min_id,
+            max_id=max_id,
+            from_user=from_user,
+            offset_date=offset_date,
+            add_offset=add_offset,
+            filter=filter,
+            search=search,
+            reply_to=reply_to,
+            scheduled=scheduled
+        )
+        page = []
+        async for message in it:
+            page.append(message)
+            if len(page) == _MAX_CHUNK_SIZE:
+                columns.extend(page)
+                page.clear()
+
+        columns.extend(page)
+        return columns
+
     # endregion
 
     # region Message sending/editing/deleting
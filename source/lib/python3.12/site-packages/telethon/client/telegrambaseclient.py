@@ -10,10 +10,15 @@ import typing
 import datetime
 import pathlib
 
-from .. import utils, version, helpers, __name__ as __base_name__
-from ..crypto import rsa
+from .. import utils, version, helpers, errors, __name__ as __base_name__
+from ..crypto import rsa, AuthKey
 from ..extensions import markdown
+from ..extensions.scheduler import Scheduler
+from ..loopwatchdog import LoopWatchdog
+from ..mediacache import MediaCache
+from ..messagestore import MessageStore
 from ..network import MTProtoSender, Connection, ConnectionTcpFull, TcpMTProxy
+from ..resultcache import ResultCache, SessionResultCache
 from ..sessions import Session, SQLiteSession, MemorySession
 from ..tl import functions, types
 from ..tl.alltlobjects import LAYER
@@ -158,6 +163,12 @@ class TelegramBaseClient(abc.ABC):
             should *not* perform long-running operations since new
             updates are put inside of an unbounded queue.
 
+        channel_diff_concurrency (`int`, optional):
+            How many channels may have their difference fetched at the same
+            time when recovering from gaps (for example, after reconnecting
+            or when catching up). The differences for each channel are still
+            applied in order. Defaults to 1 (one channel at a time).
+
         flood_sleep_threshold (`int` | `float`, optional):
             The threshold below which the library should automatically
             sleep on flood wait and slow mode wait errors (inclusive). For instance, if a
@@ -224,6 +235,77 @@ class TelegramBaseClient(abc.ABC):
             Setting this limit too low will cause the library to attempt to
             flush entities to the session file even if no entities can be
             removed from the in-memory cache, which will degrade performance.
+
+        bulk_connections (`int`, optional):
+            How many extra connections may be opened to each data center
+            for big file transfers (``upload.getFile``, ``upload.saveFilePart``
+            and friends). These are opened on demand, up to this many at
+            once, and closed again after a while without use, so that large
+            parts don't delay other requests sent through the main connection.
+
+            By default this is 0, and file transfers share the connection
+            used by every other request to that data center.
+
+        batch_window (`int`, optional):
+            How many microseconds to wait for more requests before sending
+            a batch which would not fill a message container. A small window
+            (such as 500) lets bursts of requests share a single container,
+            at the cost of that much latency for lone requests.
+
+            By default this is 0, and requests are sent as soon as possible.
+            See `send_stats` to know how full the batches are.
+
+        max_pending_requests (`int`, optional):
+            How many requests may be in flight at once (sent but without a
+            result yet) through the main connection. Once reached, further
+            requests wait until some of the previous ones complete.
+
+            By default there is no limit.
+
+        max_pending_bytes (`int`, optional):
+            Like ``max_pending_requests``, but limits the total size of the
+            requests in flight, which bounds memory use when uploading.
+
+            By default there is no limit.
+
+        message_store (`str` | `telethon.messagestore.MessageStore`, optional):
+            The file name of a database (or the `MessageStore` instance) where
+            the messages fetched by `iter_messages` and `get_messages` will be
+            kept. Later requests for the same messages by ``ids`` will then be
+            answered from it instead of asking Telegram again.
+
+            The messages are kept per account, so several clients (even
+            if logged in to different accounts) may share the same
+            `MessageStore` instance.
+
+            By default, no messages are stored.
+
+        media_cache (`str` | `telethon.mediacache.MediaCache`, optional):
+            The directory (or the `MediaCache` instance) where the photos
+            and documents downloaded by `download_media` will be kept.
+            Downloading the same media again will then copy the file from
+            it instead of asking Telegram, and interrupted downloads will
+            resume from where they were left.
+
+            By default, no media is cached.
+
+        loop_watchdog (`float` | `telethon.loopwatchdog.LoopWatchdog`, optional):
+            If set, a warning is logged every time the event loop is blocked
+            for longer than this many seconds while connected, along with
+            the event handler (or coroutine) which was running. A summary
+            is also logged every minute. A `LoopWatchdog` may be given to
+            configure it further (for example, to log the stack traces).
+
+            By default, the event loop is not watched.
+
+        result_cache (`bool` | `telethon.resultcache.ResultCache`, optional):
+            If `True`, the results of requests which take a ``hash`` (such
+            as the installed stickers, contacts or available reactions) will
+            be kept in the session, and requesting them again will only
+            download them if they changed. A `ResultCache` may be given to
+            keep them somewhere else (for example, only in memory).
+
+            By default, no results are cached.
     """
 
     # Current TelegramClient version
@@ -251,6 +333,7 @@ class TelegramBaseClient(abc.ABC):
             retry_delay: int = 1,
             auto_reconnect: bool = True,
             sequential_updates: bool = False,
+            channel_diff_concurrency: int = 1,
             flood_sleep_threshold: int = 60,
             raise_last_call_error: bool = False,
             device_model: str = None,
@@ -262,7 +345,15 @@ class TelegramBaseClient(abc.ABC):
             base_logger: typing.Union[str, logging.Logger] = None,
             receive_updates: bool = True,
             catch_up: bool = False,
-            entity_cache_limit: int = 5000
+            entity_cache_limit: int = 5000,
+            bulk_connections: int = 0,
+            batch_window: int = 0,
+            max_pending_requests: int = None,
+            max_pending_bytes: int = None,
+            message_store: 'typing.Union[str, pathlib.Path, MessageStore]' = None,
+            media_cache: 'typing.Union[str, pathlib.Path, MediaCache]' = None,
+            loop_watchdog: 'typing.Union[float, LoopWatchdog]' = None,
+            result_cache: 'typing.Union[bool, ResultCache]' = False
     ):
         if not api_id or not api_hash:
             raise ValueError(
@@ -393,6 +484,11 @@ class TelegramBaseClient(abc.ABC):
         # Cache ``{dc_id: (_ExportState, MTProtoSender)}`` for all borrowed senders
         self._borrowed_senders = {}
         self._borrow_sender_lock = asyncio.Lock()
+
+        # Cache ``{dc_id: [(_ExportState, MTProtoSender)]}`` for the senders
+        # dedicated to file transfers (which can be in the home DC too)
+        self._bulk_connections = max(bulk_connections or 0, 0)
+        self._bulk_senders = {}
         self._exported_sessions = {}
 
         self._loop = None  # only used as a sanity check
@@ -404,16 +500,23 @@ class TelegramBaseClient(abc.ABC):
 
         # Used for non-sequential updates, in order to terminate all pending tasks on disconnect.
         self._sequential_updates = sequential_updates
+        self._channel_diff_concurrency = max(channel_diff_concurrency or 1, 1)
         self._event_handler_tasks = set()
 
         self._authorized = None  # None = unknown, False = no, True = yes
 
         # Some further state for subclasses
         self._event_builders = []
+        self._pattern_index = None  # built from the above when dispatching
 
         # {chat_id: {Conversation}}
         self._conversations = collections.defaultdict(set)
 
+        # Conversations with pending `wait_event` calls, which may be
+        # waiting for events from any chat and not just their own.
+        # {Conversation}
+        self._event_conversations = set()
+
         # Hack to workaround the fact Telegram may send album updates as
         # different Updates when being sent from a different data center.
         # {grouped_id: AlbumHack}
@@ -423,6 +526,10 @@ class TelegramBaseClient(abc.ABC):
         #        for a second at most.
         self._albums = {}
 
+        # Deadlines for albums, conversation timeouts and chat actions,
+        # all driven by a single timer in the event loop.
+        self._scheduler = Scheduler(self._log)
+
         # Default parse mode
         self._parse_mode = markdown
 
@@ -442,6 +549,32 @@ class TelegramBaseClient(abc.ABC):
         self._mb_entity_cache = MbEntityCache()  # required for proper update handling (to know when to getDifference)
         self._entity_cache_limit = entity_cache_limit
 
+        # Optional on-disk store of fetched messages, to answer lookups by ID
+        if isinstance(message_store, (str, pathlib.Path)):
+            message_store = MessageStore(message_store)
+        self._message_store = message_store
+
+        # Optional on-disk cache of downloaded media, keyed by their ID
+        if isinstance(media_cache, (str, pathlib.Path)):
+            media_cache = MediaCache(media_cache)
+        self._media_cache = media_cache
+
+        # {(path, mtime, size): digest} of the files sent with ``allow_cache``
+        self._file_digests = {}
+
+        # Process pool for the handlers added with ``executor='process'``
+        self._handler_pool = None
+
+        # Optional detection of what blocks the event loop, while connected
+        if isinstance(loop_watchdog, (int, float)):
+            loop_watchdog = LoopWatchdog(loop_watchdog)
+        self._loop_watchdog = loop_watchdog
+
+        # Optional cache of the results of requests which take a ``hash``
+        if result_cache is True:
+            result_cache = SessionResultCache(self.session)
+        self._result_cache = result_cache or None
+
         self._sender = MTProtoSender(
             self.session.auth_key,
             loggers=self._log,
@@ -451,7 +584,10 @@ class TelegramBaseClient(abc.ABC):
             connect_timeout=self._timeout,
             auth_key_callback=self._auth_key_callback,
             updates_queue=self._updates_queue,
-            auto_reconnect_callback=self._handle_auto_reconnect
+            auto_reconnect_callback=self._handle_auto_reconnect,
+            batch_window=batch_window,
+            max_pending=max_pending_requests,
+            max_pending_bytes=max_pending_bytes
         )
 
 
@@ -494,6 +630,25 @@ class TelegramBaseClient(abc.ABC):
         """
         return self._sender.disconnected
 
+    @property
+    def send_stats(self: 'TelegramClient') -> dict:
+        """
+        Property with a `dict` describing how the requests sent through
+        the main connection were packed so far: the amount of ``batches``
+        (each sent in a single message container or alone), ``messages``
+        and ``bytes``, the ``average_fill`` of the containers (between 0
+        and 1) and the ``average_length`` of the batches.
+
+        Useful to tune ``batch_window``.
+
+        Example
+            .. code-block:: python
+
+                stats = client.send_stats
+                print('Messages per batch:', stats['average_length'])
+        """
+        return self._sender.send_stats
+
     @property
     def flood_sleep_threshold(self):
         return self._flood_sleep_threshold
@@ -600,7 +755,10 @@ class TelegramBaseClient(abc.ABC):
         if self._no_updates:
             req = functions.InvokeWithoutUpdatesRequest(req)
 
-        await self._sender.send(functions.InvokeWithLayerRequest(LAYER, req))
+        config = await self._sender.send(functions.InvokeWithLayerRequest(LAYER, req))
+        if isinstance(config, types.Config):
+            # We get it for free on every connection, so keep the fresh copy
+            await self._save_config(config)
 
         if self._message_box.is_empty():
             me = await self.get_me()
@@ -609,6 +767,8 @@ class TelegramBaseClient(abc.ABC):
 
         self._updates_handle = self.loop.create_task(self._update_loop())
         self._keepalive_handle = self.loop.create_task(self._keepalive_loop())
+        if self._loop_watchdog:
+            self._loop_watchdog.start(self.loop, self._log, lambda: self._event_builders)
 
     def is_connected(self: 'TelegramClient') -> bool:
         """
@@ -734,6 +894,13 @@ class TelegramBaseClient(abc.ABC):
             # If any was borrowed
             self._borrowed_senders.clear()
 
+            for pool in self._bulk_senders.values():
+                for state, sender in pool:
+                    await sender.disconnect()
+                    state._connected = False
+
+            self._bulk_senders.clear()
+
         # trio's nurseries would handle this for us, but this is asyncio.
         # All tasks spawned in the background should properly be terminated.
         if self._event_handler_tasks:
@@ -743,8 +910,25 @@ class TelegramBaseClient(abc.ABC):
             await asyncio.wait(self._event_handler_tasks)
             self._event_handler_tasks.clear()
 
+        # Nothing scheduled should run (or keep a timer) after disconnecting.
+        # Conversations would then wait forever, so they're cancelled first.
+        for conv_set in self._conversations.values():
+            for conv in conv_set:
+                conv.cancel()
+
+        self._scheduler.clear()
+
         await self._save_states_and_entities()
 
+        if self._message_store:
+            self._message_store.save()
+
+        if self._handler_pool:
+            self._handler_pool.shutdown(wait=False)
+
+        if self._loop_watchdog:
+            self._loop_watchdog.stop()
+
         await utils.maybe_async(self.session.close())
 
     async def _disconnect(self: 'TelegramClient'):
@@ -787,11 +971,24 @@ class TelegramBaseClient(abc.ABC):
 
     # region Working with different connections/Data Centers
 
+    async def _save_config(self: 'TelegramClient', config):
+        """
+        Caches the given ``Config`` both in memory and in the session,
+        so that restarts don't need to fetch it again until it expires.
+        """
+        self.__class__._config = config
+        await utils.maybe_async(self.session.set_config(config))
+        await utils.maybe_async(self.session.save())
+
     async def _get_dc(self: 'TelegramClient', dc_id, cdn=False):
         """Gets the Data Center (DC) associated to 'dc_id'"""
         cls = self.__class__
         if not cls._config:
-            cls._config = await self(functions.help.GetConfigRequest())
+            config = await utils.maybe_async(self.session.get_config())
+            if config and config.expires and config.expires > datetime.datetime.now(tz=datetime.timezone.utc):
+                cls._config = config
+            else:
+                await self._save_config(await self(functions.help.GetConfigRequest()))
 
         if cdn and not self._cdn_config:
             cls._cdn_config = await self(functions.help.GetCdnConfigRequest())
@@ -830,6 +1027,33 @@ class TelegramBaseClient(abc.ABC):
         #
         # If one were to do that, Telegram would reset the connection
         # with no further clues.
+        #
+        # If the session remembers a key which was authorized in this DC
+        # before, reuse it to skip both the (expensive) key generation and
+        # the export/import round-trips.
+        auth_key = await utils.maybe_async(self.session.get_exported_auth_key(dc_id))
+        if auth_key:
+            sender = MTProtoSender(auth_key, loggers=self._log)
+            await sender.connect(self._connection(
+                dc.ip_address,
+                dc.port,
+                dc.id,
+                loggers=self._log,
+                proxy=self._proxy,
+                local_addr=self._local_addr
+            ))
+            self._log[__name__].info('Reusing saved auth for new borrowed sender in %s', dc)
+            self._init_request.query = functions.users.GetUsersRequest([types.InputUserSelf()])
+            try:
+                await sender.send(functions.InvokeWithLayerRequest(LAYER, self._init_request))
+                return sender
+            except (errors.UnauthorizedError, errors.AuthKeyNotFound, ConnectionError) as e:
+                # The server may have forgotten the key (in which case the
+                # sender disconnects itself), so start over with a new one
+                self._log[__name__].info('Saved auth for %s is no longer valid: %s', dc, e.__class__.__name__)
+                await utils.maybe_async(self.session.set_exported_auth_key(dc_id, None))
+                await sender.disconnect()
+
         sender = MTProtoSender(None, loggers=self._log)
         await sender.connect(self._connection(
             dc.ip_address,
@@ -844,16 +1068,84 @@ class TelegramBaseClient(abc.ABC):
         self._init_request.query = functions.auth.ImportAuthorizationRequest(id=auth.id, bytes=auth.bytes)
         req = functions.InvokeWithLayerRequest(LAYER, self._init_request)
         await sender.send(req)
+
+        await utils.maybe_async(self.session.set_exported_auth_key(dc_id, sender.auth_key))
+        await utils.maybe_async(self.session.save())
+        return sender
+
+    async def _create_bulk_sender(self: 'TelegramClient', dc_id):
+        """
+        Creates a new `MTProtoSender` for the given `dc_id` to be used only
+        for file transfers. This method should be used by `_borrow_bulk_sender`.
+        """
+        if dc_id != self.session.dc_id:
+            return await self._create_exported_sender(dc_id)
+
+        # The home DC needs no exporting. Every sender has its own MTProto
+        # session, so a copy of the authorized key can be used as-is.
+        dc = await self._get_dc(dc_id)
+        sender = MTProtoSender(AuthKey(self._sender.auth_key.key), loggers=self._log)
+        await sender.connect(self._connection(
+            dc.ip_address,
+            dc.port,
+            dc.id,
+            loggers=self._log,
+            proxy=self._proxy,
+            local_addr=self._local_addr
+        ))
+        self._log[__name__].info('Created new bulk sender in home %s', dc)
+        self._init_request.query = functions.help.GetNearestDcRequest()
+        await sender.send(functions.InvokeWithLayerRequest(LAYER, self._init_request))
         return sender
 
-    async def _borrow_exported_sender(self: 'TelegramClient', dc_id):
+    async def _borrow_bulk_sender(self: 'TelegramClient', dc_id):
+        """
+        Borrows a connected `MTProtoSender` dedicated to file transfers.
+
+        An idle sender is preferred. If all of them are busy, a new one is
+        created until there are ``bulk_connections``, and after that, the
+        least busy sender is shared.
+        """
+        async with self._borrow_sender_lock:
+            self._log[__name__].debug('Borrowing bulk sender for dc_id %d', dc_id)
+            pool = self._bulk_senders.setdefault(dc_id, [])
+            state, sender = min(
+                pool, key=lambda p: (p[0]._n, p[0].need_connect()), default=(None, None))
+
+            if state is None or (state._n and len(pool) < self._bulk_connections):
+                state = _ExportState()
+                sender = await self._create_bulk_sender(dc_id)
+                sender.dc_id = dc_id
+                pool.append((state, sender))
+
+            elif state.need_connect():
+                dc = await self._get_dc(dc_id)
+                await sender.connect(self._connection(
+                    dc.ip_address,
+                    dc.port,
+                    dc.id,
+                    loggers=self._log,
+                    proxy=self._proxy,
+                    local_addr=self._local_addr
+                ))
+
+            state.add_borrow()
+            return sender
+
+    async def _borrow_exported_sender(self: 'TelegramClient', dc_id, bulk=False):
         """
         Borrows a connected `MTProtoSender` for the given `dc_id`.
         If it's not cached, creates a new one if it doesn't exist yet,
         and imports a freshly exported authorization key for it to be usable.
 
+        If `bulk` is `True` and the client has ``bulk_connections``, one of
+        the senders dedicated to file transfers is borrowed instead.
+
         Once its job is over it should be `_return_exported_sender`.
         """
+        if bulk and self._bulk_connections:
+            return await self._borrow_bulk_sender(dc_id)
+
         async with self._borrow_sender_lock:
             self._log[__name__].debug('Borrowing sender for dc_id %d', dc_id)
             state, sender = self._borrowed_senders.get(dc_id, (None, None))
@@ -885,7 +1177,9 @@ class TelegramBaseClient(abc.ABC):
         """
         async with self._borrow_sender_lock:
             self._log[__name__].debug('Returning borrowed sender for dc_id %d', sender.dc_id)
-            state, _ = self._borrowed_senders[sender.dc_id]
+            state = next((st for st, s in self._bulk_senders.get(sender.dc_id, ()) if s is sender), None)
+            if state is None:
+                state, _ = self._borrowed_senders[sender.dc_id]
             state.add_return()
 
     async def _clean_exported_senders(self: 'TelegramClient'):
@@ -902,6 +1196,18 @@ class TelegramBaseClient(abc.ABC):
                     await sender.disconnect()
                     state.mark_disconnected()
 
+            # Bulk senders scale back down to zero when they're not needed
+            for dc_id, pool in self._bulk_senders.items():
+                for state, sender in pool:
+                    if state.should_disconnect():
+                        self._log[__name__].info(
+                            'Disconnecting bulk sender for DC %d', dc_id)
+
+                        await sender.disconnect()
+                        state.mark_disconnected()
+
+                pool[:] = [(state, sender) for state, sender in pool if not state.need_connect()]
+
     async def _get_cdn_client(self: 'TelegramClient', cdn_redirect):
         """Similar to ._borrow_exported_client, but for CDNs"""
         session = self._exported_sessions.get(cdn_redirect.dc_id)
@@ -13,6 +13,7 @@ import sqlite3
 
 from .. import events, utils, errors
 from ..events.common import EventBuilder, EventCommon
+from ..handlerpool import HandlerPool, _PoolCallback
 from ..tl import types, functions
 from .._updates import GapError, PrematureEndReason
 from ..helpers import get_running_loop
@@ -100,7 +101,7 @@ class UpdateMethods:
             # No loop.run_until_complete; it's already syncified
             self.disconnect()
 
-    def on(self: 'TelegramClient', event: EventBuilder):
+    def on(self: 'TelegramClient', event: EventBuilder, *, executor=None):
         """
         Decorator used to `add_event_handler` more conveniently.
 
@@ -110,6 +111,9 @@ class UpdateMethods:
                 The event builder class or instance to be used,
                 for instance ``events.NewMessage``.
 
+            executor (`str` | `telethon.handlerpool.HandlerPool`, optional):
+                Where the handler should run. See `add_event_handler`.
+
         Example
             .. code-block:: python
 
@@ -122,7 +126,7 @@ class UpdateMethods:
                     ...
         """
         def decorator(f):
-            self.add_event_handler(f, event)
+            self.add_event_handler(f, event, executor=executor)
             return f
 
         return decorator
@@ -130,7 +134,9 @@ class UpdateMethods:
     def add_event_handler(
             self: 'TelegramClient',
             callback: Callback,
-            event: EventBuilder = None):
+            event: EventBuilder = None,
+            *,
+            executor: 'typing.Union[str, HandlerPool]' = None):
         """
         Registers a new event handler callback.
 
@@ -152,6 +158,14 @@ class UpdateMethods:
                 :tl:`Update` objects with no further processing) will
                 be passed instead.
 
+            executor (`str` | `telethon.handlerpool.HandlerPool`, optional):
+                If ``'process'``, the callback will run in a process pool
+                shared by the client, so that CPU-bound work doesn't block
+                the event loop. A `HandlerPool` may be given instead to
+                choose how many processes to use and how many events may
+                wait. See `HandlerPool` for what such handlers receive and
+                return. By default, the callback runs in the event loop.
+
         Example
             .. code-block:: python
 
@@ -163,7 +177,15 @@ class UpdateMethods:
 
                 client.add_event_handler(handler, events.NewMessage)
         """
-        builders = events._get_handlers(callback)
+        if executor == 'process':
+            callback = _PoolCallback(self, callback, None)
+        elif isinstance(executor, HandlerPool):
+            callback = _PoolCallback(self, callback, executor)
+        elif executor is not None:
+            raise ValueError('executor must be \'process\' or a HandlerPool, not {!r}'.format(executor))
+
+        self._pattern_index = None
+        builders = events._get_handlers(getattr(callback, 'callback', callback))
         if builders is not None:
             for event in builders:
                 self._event_builders.append((event, callback))
@@ -201,6 +223,7 @@ class UpdateMethods:
                 # "handler" will stop receiving anything
                 client.remove_event_handler(handler)
         """
+        self._pattern_index = None
         found = 0
         if event and not isinstance(event, type):
             event = type(event)
@@ -234,7 +257,14 @@ class UpdateMethods:
                 for callback, event in client.list_event_handlers():
                     print(id(callback), type(event))
         """
-        return [(callback, event) for event, callback in self._event_builders]
+        return [(getattr(callback, 'callback', callback), event)
+                for event, callback in self._event_builders]
+
+    def _get_handler_pool(self: 'TelegramClient'):
+        # Only created when a handler first needs it, as processes are costly
+        if self._handler_pool is None:
+            self._handler_pool = HandlerPool()
+        return self._handler_pool
 
     async def catch_up(self: 'TelegramClient'):
         """
@@ -262,6 +292,9 @@ class UpdateMethods:
         was_once_logged_in = self._authorized is True or not self._message_box.is_empty()
 
         self._updates_error = None
+
+        # {channel_id: (GetChannelDifferenceRequest, Task)} currently being fetched
+        channel_diffs = {}
         try:
             if self._catch_up:
                 # User wants to catch up as soon as the client is up and running,
@@ -347,104 +380,31 @@ class UpdateMethods:
                     updates_to_dispatch.extend(_preprocess_updates)
                     continue
 
-                get_diff = self._message_box.get_channel_difference(self._mb_entity_cache)
-                if get_diff:
-                    self._log[__name__].debug('Getting difference for channel %s updates', get_diff.channel.channel_id)
-                    try:
-                        diff = await self(get_diff)
-                    except (errors.UnauthorizedError, errors.AuthKeyError) as e:
-                        # Not logged in or broken authorization key, can't get difference
-                        self._log[__name__].warning(
-                            'Cannot get difference for channel %s since the account is not logged in: %s',
-                            get_diff.channel.channel_id, type(e).__name__
-                        )
-                        self._message_box.end_channel_difference(
-                            get_diff,
-                            PrematureEndReason.TEMPORARY_SERVER_ISSUES,
-                            self._mb_entity_cache
-                        )
-                        if was_once_logged_in:
-                            self._updates_error = e
-                            await self.disconnect()
-                            break
-                        continue
-                    except (errors.TypeNotFoundError, sqlite3.OperationalError) as e:
-                        self._log[__name__].warning(
-                            'Cannot get difference for channel %s since the account is likely misusing the session: %s',
-                            get_diff.channel.channel_id, e
-                        )
-                        self._message_box.end_channel_difference(
-                            get_diff,
-                            PrematureEndReason.TEMPORARY_SERVER_ISSUES,
-                            self._mb_entity_cache
-                        )
-                        self._updates_error = e
-                        await self.disconnect()
+                # Fetch the difference of several channels at once (up to the configured
+                # concurrency), but never more than one request per channel at a time,
+                # so that the differences of each channel are applied in order.
+                while len(channel_diffs) < self._channel_diff_concurrency:
+                    get_diff = self._message_box.get_channel_difference(
+                        self._mb_entity_cache, exclude=channel_diffs)
+                    if not get_diff:
                         break
-                    except (
-                        errors.PersistentTimestampOutdatedError,
-                        errors.PersistentTimestampInvalidError,
-                        errors.ServerError,
-                        errors.TimedOutError,
-                        errors.FloodWaitError,
-                        ValueError
-                    ) as e:
-                        # According to Telegram's docs:
-                        # "Channel internal replication issues, try again later (treat this like an RPC_CALL_FAIL)."
-                        # We can treat this as "empty difference" and not update the local pts.
-                        # Then this same call will be retried when another gap is detected or timeout expires.
-                        #
-                        # Another option would be to literally treat this like an RPC_CALL_FAIL and retry after a few
-                        # seconds, but if Telegram is having issues it's probably best to wait for it to send another
-                        # update (hinting it may be okay now) and retry then.
-                        #
-                        # This is a bit hacky because MessageBox doesn't really have a way to "not update" the pts.
-                        # Instead we manually extract the previously-known pts and use that.
-                        #
-                        # For PersistentTimestampInvalidError:
-                        # Somehow our pts is either too new or the server does not know about this.
-                        # We treat this as PersistentTimestampOutdatedError for now.
-                        # TODO investigate why/when this happens and if this is the proper solution
-                        self._log[__name__].warning(
-                            'Getting difference for channel updates %s caused %s;'
-                            ' ending getting difference prematurely until server issues are resolved',
-                            get_diff.channel.channel_id, type(e).__name__
-                        )
-                        self._message_box.end_channel_difference(
-                            get_diff,
-                            PrematureEndReason.TEMPORARY_SERVER_ISSUES,
-                            self._mb_entity_cache
-                        )
-                        continue
-                    except (errors.ChannelPrivateError, errors.ChannelInvalidError):
-                        # Timeout triggered a get difference, but we have been banned in the channel since then.
-                        # Because we can no longer fetch updates from this channel, we should stop keeping track
-                        # of it entirely.
-                        self._log[__name__].info(
-                            'Account is now banned in %d so we can no longer fetch updates from it',
-                            get_diff.channel.channel_id
-                        )
-                        self._message_box.end_channel_difference(
-                            get_diff,
-                            PrematureEndReason.BANNED,
-                            self._mb_entity_cache
-                        )
-                        continue
-                    except OSError as e:
-                        self._log[__name__].info(
-                            'Cannot get difference for channel %d since the network is down: %s: %s',
-                            get_diff.channel.channel_id, type(e).__name__, e
-                        )
-                        await asyncio.sleep(5)
-                        continue
 
-                    updates, users, chats = self._message_box.apply_channel_difference(get_diff, diff, self._mb_entity_cache)
-                    if updates:
-                        self._log[__name__].info('Got difference for channel %d updates', get_diff.channel.channel_id)
+                    self._log[__name__].debug('Getting difference for channel %s updates', get_diff.channel.channel_id)
+                    channel_diffs[get_diff.channel.channel_id] = (get_diff, self.loop.create_task(self(get_diff)))
 
-                    _preprocess_updates = await self._preprocess_updates(updates, users, chats)
-                    updates_to_dispatch.extend(_preprocess_updates)
-                    continue
+                if channel_diffs:
+                    done, _ = await asyncio.wait(
+                        [task for _, task in channel_diffs.values()], return_when=asyncio.FIRST_COMPLETED)
+
+                    for channel_id in [c for c, (_, task) in channel_diffs.items() if task in done]:
+                        get_diff, task = channel_diffs.pop(channel_id)
+                        updates = await self._handle_channel_difference(get_diff, task, was_once_logged_in)
+                        if updates is None:
+                            break
+                        updates_to_dispatch.extend(updates)
+                    else:
+                        continue
+                    break
 
                 deadline = self._message_box.check_deadlines()
                 deadline_delay = deadline - get_running_loop().time()
@@ -472,6 +432,112 @@ class UpdateMethods:
             self._log[__name__].exception(f'Fatal error handling updates (this is a bug in Telethon v{__version__}, please report it)')
             self._updates_error = e
             await self.disconnect()
+        finally:
+            for _, task in channel_diffs.values():
+                task.cancel()
+
+    async def _handle_channel_difference(self, get_diff, task, was_once_logged_in):
+        """
+        Applies the result of the given finished channel difference ``task``
+        (or handles its error), returning the updates to dispatch, or `None`
+        if the update loop should stop.
+        """
+        try:
+            diff = task.result()
+        except (errors.UnauthorizedError, errors.AuthKeyError) as e:
+            # Not logged in or broken authorization key, can't get difference
+            self._log[__name__].warning(
+                'Cannot get difference for channel %s since the account is not logged in: %s',
+                get_diff.channel.channel_id, type(e).__name__
+            )
+            self._message_box.end_channel_difference(
+                get_diff,
+                PrematureEndReason.TEMPORARY_SERVER_ISSUES,
+                self._mb_entity_cache
+            )
+            if was_once_logged_in:
+                self._updates_error = e
+                await self.disconnect()
+                return None
+            return []
+        except (errors.TypeNotFoundError, sqlite3.OperationalError) as e:
+            self._log[__name__].warning(
+                'Cannot get difference for channel %s since the account is likely misusing the session: %s',
+                get_diff.channel.channel_id, e
+            )
+            self._message_box.end_channel_difference(
+                get_diff,
+                PrematureEndReason.TEMPORARY_SERVER_ISSUES,
+                self._mb_entity_cache
+            )
+            self._updates_error = e
+            await self.disconnect()
+            return None
+        except (
+            errors.PersistentTimestampOutdatedError,
+            errors.PersistentTimestampInvalidError,
+            errors.ServerError,
+            errors.TimedOutError,
+            errors.FloodWaitError,
+            ValueError
+        ) as e:
+            # According to Telegram's docs:
+            # "Channel internal replication issues, try again later (treat this like an RPC_CALL_FAIL)."
+            # We can treat this as "empty difference" and not update the local pts.
+            # Then this same call will be retried when another gap is detected or timeout expires.
+            #
+            # Another option would be to literally treat this like an RPC_CALL_FAIL and retry after a few
+            # seconds, but if Telegram is having issues it's probably best to wait for it to send another
+            # update (hinting it may be okay now) and retry then.
+            #
+            # This is a bit hacky because MessageBox doesn't really have a way to "not update" the pts.
+            # Instead we manually extract the previously-known pts and use that.
+            #
+            # For PersistentTimestampInvalidError:
+            # Somehow our pts is either too new or the server does not know about this.
+            # We treat this as PersistentTimestampOutdatedError for now.
+            # TODO investigate why/when this happens and if this is the proper solution
+            #
+            # Flood waits are remembered per request type, so the other channels
+            # being fetched concurrently will wait for it too (or fail the same way).
+            self._log[__name__].warning(
+                'Getting difference for channel updates %s caused %s;'
+                ' ending getting difference prematurely until server issues are resolved',
+                get_diff.channel.channel_id, type(e).__name__
+            )
+            self._message_box.end_channel_difference(
+                get_diff,
+                PrematureEndReason.TEMPORARY_SERVER_ISSUES,
+                self._mb_entity_cache
+            )
+            return []
+        except (errors.ChannelPrivateError, errors.ChannelInvalidError):
+            # Timeout triggered a get difference, but we have been banned in the channel since then.
+            # Because we can no longer fetch updates from this channel, we should stop keeping track
+            # of it entirely.
+            self._log[__name__].info(
+                'Account is now banned in %d so we can no longer fetch updates from it',
+                get_diff.channel.channel_id
+            )
+            self._message_box.end_channel_difference(
+                get_diff,
+                PrematureEndReason.BANNED,
+                self._mb_entity_cache
+            )
+            return []
+        except OSError as e:
+            self._log[__name__].info(
+                'Cannot get difference for channel %d since the network is down: %s: %s',
+                get_diff.channel.channel_id, type(e).__name__, e
+            )
+            await asyncio.sleep(5)
+            return []
+
+        updates, users, chats = self._message_box.apply_channel_difference(get_diff, diff, self._mb_entity_cache)
+        if updates:
+            self._log[__name__].info('Got difference for channel %d updates', get_diff.channel.channel_id)
+
+        return await self._preprocess_updates(updates, users, chats)
 
     async def _preprocess_updates(self, updates, users, chats):
         self._mb_entity_cache.extend(users, chats)
@@ -480,6 +546,8 @@ class UpdateMethods:
                     for x in itertools.chain(users, chats)}
         for u in updates:
             u._entities = entities
+        if self._message_store:
+            self._message_store.process_updates(self._mb_entity_cache.self_id, updates)
         return updates
 
     async def _keepalive_loop(self: 'TelegramClient'):
@@ -521,6 +589,8 @@ class UpdateMethods:
             await self._save_states_and_entities()
 
             await utils.maybe_async(self.session.save())
+            if self._message_store:
+                self._message_store.save()
 
     async def _dispatch_update(self: 'TelegramClient', update):
         # TODO only used for AlbumHack, and MessageBox is not really designed for this
@@ -539,24 +609,34 @@ class UpdateMethods:
                 pass  # might not have connection
 
         built = EventBuilderDict(self, update, others)
-        for conv_set in self._conversations.values():
-            for conv in conv_set:
-                ev = built[events.NewMessage]
-                if ev:
+        if self._conversations:
+            # Conversations only care about their own chat, so the events
+            # are built once and only given to the conversations in there.
+            ev = built[events.NewMessage]
+            if ev:
+                for conv in tuple(self._conversations.get(ev.chat_id, ())):
                     conv._on_new_message(ev)
 
-                ev = built[events.MessageEdited]
-                if ev:
+            ev = built[events.MessageEdited]
+            if ev:
+                for conv in tuple(self._conversations.get(ev.chat_id, ())):
                     conv._on_edit(ev)
 
-                ev = built[events.MessageRead]
-                if ev:
+            ev = built[events.MessageRead]
+            if ev:
+                for conv in tuple(self._conversations.get(ev.chat_id, ())):
                     conv._on_read(ev)
 
-                if conv._custom:
-                    await conv._check_custom(built)
+        # Custom events may come from any chat (e.g. waiting for someone
+        # to join a group), so every conversation waiting on one is checked.
+        for conv in tuple(self._event_conversations):
+            if conv._custom:
+                await conv._check_custom(built)
 
-        for builder, callback in self._event_builders:
+        if self._pattern_index is None:
+            self._pattern_index = _PatternIndex(self._event_builders)
+
+        for builder, callback in self._pattern_index.route(self._event_builders, built):
             event = built[type(builder)]
             if not event:
                 continue
@@ -676,6 +756,61 @@ class UpdateMethods:
     # endregion
 
 
+class _PatternIndex:
+    """
+    Index of the `events.NewMessage` builders (and subclasses) by the
+    literal prefix of their pattern, so that all of them are checked
+    against the text of a message with a few lookups, and only those
+    which may match have their pattern (and the rest of filters) run.
+    """
+    def __init__(self, builders):
+        # {(length, ignore_case): {prefix: [position in builders]}}
+        self._tables = {}
+        self._always = []
+        self._types = set()
+        for i, (builder, _) in enumerate(builders):
+            prefix = getattr(builder, '_pattern_prefix', None)
+            if not prefix or type(builder).filter is not events.NewMessage.filter:
+                self._always.append(i)
+                continue
+
+            text, ignore_case = prefix
+            self._tables.setdefault((len(text), ignore_case), {}) \
+                .setdefault(text, []).append(i)
+            self._types.add(type(builder))
+
+    def route(self, builders, built):
+        """
+        Returns the ``(builder, callback)`` pairs which should be
+        checked for the given `EventBuilderDict`, in their order.
+        """
+        if not self._tables:
+            return builders
+
+        text = None
+        for cls in self._types:
+            event = built[cls]
+            if event:
+                text = event.message.message or ''
+                break
+
+        positions = list(self._always)
+        if text is not None:
+            for (length, ignore_case), table in self._tables.items():
+                head = text[:length]
+                if not ignore_case:
+                    positions += table.get(head, ())
+                elif head.isascii():
+                    positions += table.get(head.lower(), ())
+                else:
+                    # Some non-ASCII characters case-fold into ASCII ones
+                    for found in table.values():
+                        positions += found
+
+        positions.sort()
+        return [builders[i] for i in positions]
+
+
 class EventBuilderDict:
     """
     Helper "dictionary" to return events from types and cache them.
@@ -9,7 +9,7 @@ from io import BytesIO
 
 from ..crypto import AES
 
-from .. import utils, helpers, hints
+from .. import utils, helpers, hints, errors
 from ..tl import types, functions, custom
 
 try:
@@ -21,6 +21,31 @@ except ImportError:
 if typing.TYPE_CHECKING:
     from .telegramclient import TelegramClient
 
+# How many bytes are hashed at once when looking for already-sent files
+_DIGEST_CHUNK_SIZE = 1024 * 1024
+
+# How many file digests are remembered, keyed by their path, mtime and size
+_MAX_FILE_DIGESTS = 1000
+
+# Telegram may reject a cached file if it's no longer valid, which isn't fatal
+_STALE_FILE_ERRORS = (
+    errors.FileReferenceEmptyError,
+    errors.FileReferenceExpiredError,
+    errors.FileReferenceInvalidError,
+    errors.MediaEmptyError,
+)
+
+
+def _hash_file(path):
+    # `hashlib` releases the GIL for large inputs, so this can run in a thread
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(_DIGEST_CHUNK_SIZE)
+            if not chunk:
+                return digest.digest()
+            digest.update(chunk)
+
 
 class _CacheType:
     """Like functools.partial but pretends to be the wrapped class."""
@@ -28,7 +53,10 @@ class _CacheType:
         self._cls = cls
 
     def __call__(self, *args, **kwargs):
-        return self._cls(*args, file_reference=b'', **kwargs)
+        # Sessions which don't store the file reference only give (id, access_hash)
+        if len(args) < 3 and 'file_reference' not in kwargs:
+            kwargs['file_reference'] = b''
+        return self._cls(*args, **kwargs)
 
     def __eq__(self, other):
         return self._cls == other
@@ -124,7 +152,7 @@ class UploadMethods:
             reply_to: 'hints.MessageIDLike' = None,
             attributes: 'typing.Sequence[types.TypeDocumentAttribute]' = None,
             thumb: 'hints.FileLike' = None,
-            allow_cache: bool = True,
+            allow_cache: bool = False,
             parse_mode: str = (),
             formatting_entities: typing.Optional[
                 typing.Union[
@@ -252,9 +280,18 @@ class UploadMethods:
 
 
             allow_cache (`bool`, optional):
-                This parameter currently does nothing, but is kept for
-                backward-compatibility (and it may get its use back in
-                the future).
+                Whether files given by their path may be sent without
+                uploading them again if the same contents were sent before.
+                The files are identified by their SHA-256 and size, which
+                are recorded in the session once they are sent.
+
+                This reads the whole file to hash it (only once while it's
+                not modified), so it's disabled by default. It's also not
+                used when the file is sent with a ``thumb``, ``attributes``,
+                ``mime_type`` or any of the flags which change how it's
+                displayed, since a file sent from cache keeps the ones it
+                was first sent with. If Telegram no longer accepts it, it
+                is uploaded as usual.
 
             parse_mode (`object`, optional):
                 See the `TelegramClient.parse_mode
@@ -391,8 +428,6 @@ class UploadMethods:
                     vcard=''
                 ))
         """
-        # TODO Properly implement allow_cache to reuse the sha256 of the file
-        # i.e. `None` was used
         if not file:
             raise TypeError('Cannot use {!r} as file'.format(file))
 
@@ -456,6 +491,39 @@ class UploadMethods:
             caption, msg_entities =\
                 await self._parse_message_text(caption, parse_mode)
 
+        markup = self.build_reply_markup(buttons)
+        reply_to = None if reply_to is None else types.InputReplyToMessage(reply_to)
+        send_as = await self.get_input_entity(send_as) if send_as else None
+
+        async def send(media):
+            request = functions.messages.SendMediaRequest(
+                entity, media, reply_to=reply_to, message=caption,
+                entities=msg_entities, reply_markup=markup, silent=silent,
+                schedule_date=schedule, clear_draft=clear_draft,
+                background=background, send_as=send_as,
+                effect=message_effect_id
+            )
+            return self._get_response_message(request, await self(request), entity)
+
+        if isinstance(file, pathlib.Path):
+            file = str(file.absolute())
+
+        digest = None
+        if (allow_cache and isinstance(file, str) and os.path.isfile(file)
+                and not (thumb or attributes or mime_type or voice_note or video_note
+                         or supports_streaming or nosound_video is not None)):
+            as_image = utils.is_image(file) and not force_document
+            digest, size = await self._get_file_digest(file)
+            cached = await utils.maybe_async(self.session.get_file(digest, size, _CacheType(
+                types.InputPhoto if as_image else types.InputDocument)))
+            if cached:
+                try:
+                    return await send(utils.get_input_media(cached, ttl=ttl))
+                except _STALE_FILE_ERRORS as e:
+                    self._log[__name__].info(
+                        'Cached file %s was rejected (%s), uploading it again',
+                        file, e.__class__.__name__)
+
         file_handle, media, image = await self._file_to_media(
             file, force_document=force_document,
             mime_type=mime_type,
@@ -471,17 +539,34 @@ class UploadMethods:
         if not media:
             raise TypeError('Cannot use {!r} as file'.format(file))
 
-        markup = self.build_reply_markup(buttons)
-        reply_to = None if reply_to is None else types.InputReplyToMessage(reply_to)
-        request = functions.messages.SendMediaRequest(
-            entity, media, reply_to=reply_to, message=caption,
-            entities=msg_entities, reply_markup=markup, silent=silent,
-            schedule_date=schedule, clear_draft=clear_draft,
-            background=background,
-            send_as=await self.get_input_entity(send_as) if send_as else None,
-            effect=message_effect_id
-        )
-        return self._get_response_message(request, await self(request), entity)
+        message = await send(media)
+        if digest and message and file_handle:
+            if message.photo:
+                await utils.maybe_async(self.session.cache_file(
+                    digest, size, utils.get_input_photo(message.photo)))
+            elif message.document:
+                await utils.maybe_async(self.session.cache_file(
+                    digest, size, utils.get_input_document(message.document)))
+
+        return message
+
+    async def _get_file_digest(self: 'TelegramClient', path):
+        """
+        Returns ``(digest, size)`` for the file at the given path. Hashing
+        happens in a thread, and the result is remembered for as long as
+        the file is not modified.
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        digest = self._file_digests.get(key)
+        if digest is None:
+            digest = await helpers.get_running_loop().run_in_executor(
+                None, _hash_file, path)
+            if len(self._file_digests) >= _MAX_FILE_DIGESTS:
+                del self._file_digests[next(iter(self._file_digests))]
+            self._file_digests[key] = digest
+
+        return digest, stat.st_size
 
     async def _send_album(self: 'TelegramClient', entity, files, caption='',
                           formatting_entities=None,
@@ -1,16 +1,26 @@
 import asyncio
+import collections
+import copy
 import datetime
 import itertools
 import time
 import typing
 
-from .. import errors, helpers, utils, hints
+from .. import errors, helpers, utils, hints, resultcache
 from ..errors import MultiError, RPCError
+from ..extensions.messagepacker import BULK_REQUESTS as _BULK_REQUESTS
 from ..helpers import retry_range
 from ..tl import TLRequest, types, functions
 
 _NOT_A_REQUEST = lambda: TypeError('You can only invoke requests, not types!')
 
+# Errors which mean a request should be retried later rather than failing
+_FLOOD_ERRORS = (errors.FloodWaitError, errors.FloodPremiumWaitError,
+                 errors.SlowModeWaitError, errors.FloodTestPhoneWaitError)
+
+# Result of each request made by `iter_bulk`
+BulkResult = collections.namedtuple('BulkResult', ('index', 'request', 'result', 'error'))
+
 if typing.TYPE_CHECKING:
     from .telegramclient import TelegramClient
 
@@ -27,7 +37,18 @@ def _fmt_flood(delay, request, *, early=False, td=datetime.timedelta):
 
 class UserMethods:
     async def __call__(self: 'TelegramClient', request, ordered=False, flood_sleep_threshold=None):
-        return await self._call(self._sender, request, ordered=ordered)
+        if (self._bulk_connections
+                and getattr(request, 'CONSTRUCTOR_ID', None) in _BULK_REQUESTS
+                and self.is_connected()):
+            sender = await self._borrow_exported_sender(self.session.dc_id, bulk=True)
+            try:
+                return await self._call(sender, request, ordered=ordered,
+                                        flood_sleep_threshold=flood_sleep_threshold)
+            finally:
+                await self._return_exported_sender(sender)
+
+        return await self._call(self._sender, request, ordered=ordered,
+                                flood_sleep_threshold=flood_sleep_threshold)
 
     async def _call(self: 'TelegramClient', sender, request, ordered=False, flood_sleep_threshold=None):
         if self._loop is not None and self._loop != helpers.get_running_loop():
@@ -38,11 +59,22 @@ class UserMethods:
             flood_sleep_threshold = self.flood_sleep_threshold
         requests = list(request) if utils.is_list_like(request) else [request]
         request = list(request) if utils.is_list_like(request) else request
+        cache_key = cached = None
         for i, r in enumerate(requests):
             if not isinstance(r, TLRequest):
                 raise _NOT_A_REQUEST()
             await r.resolve(self, utils)
 
+            # Only ask for the result if it changed since the cached one
+            if self._result_cache is not None and r is request:
+                cache_key = resultcache.get_key(r)
+                if cache_key is not None:
+                    cached = self._result_cache.get(cache_key)
+                    cached_hash = None if cached is None else resultcache.get_hash(r, cached)
+                    if cached_hash:
+                        r = request = copy.copy(r)
+                        r.hash = cached_hash
+
             # Avoid making the request if it's already in a flood wait
             if r.CONSTRUCTOR_ID in self._flood_waited_requests:
                 due = self._flood_waited_requests[r.CONSTRUCTOR_ID]
@@ -69,6 +101,7 @@ class UserMethods:
 
         for attempt in retry_range(self._request_retries):
             try:
+                await sender.wait_for_capacity()
                 future = sender.send(request, ordered=ordered)
                 if isinstance(future, list):
                     results = []
@@ -90,6 +123,11 @@ class UserMethods:
                         return results
                 else:
                     result = await future
+                    if cache_key is not None:
+                        if not resultcache.is_not_modified(result):
+                            self._result_cache.set(cache_key, result)
+                        elif cached is not None:
+                            result = cached
                     await utils.maybe_async(self.session.process_entities(result))
                     return result
             except (errors.ServerError, errors.RpcCallFailError,
@@ -118,7 +156,7 @@ class UserMethods:
                 if e.seconds == 0:
                     e.seconds = 1
 
-                if e.seconds <= self.flood_sleep_threshold:
+                if e.seconds <= flood_sleep_threshold:
                     self._log[__name__].info(*_fmt_flood(e.seconds, request))
                     await asyncio.sleep(e.seconds)
                 else:
@@ -516,6 +554,154 @@ class UserMethods:
 
         return utils.get_peer_id(peer, add_mark=add_mark)
 
+    async def iter_bulk(
+            self: 'TelegramClient',
+            requests: 'typing.Iterable[TLRequest]',
+            *,
+            concurrency: int = 4,
+            retries: int = 2,
+            flood_sleep_threshold: int = None):
+        """
+        Makes many requests with up to ``concurrency`` of them in flight,
+        yielding a ``BulkResult(index, request, result, error)`` for each
+        as soon as it completes (so not necessarily in order). ``index`` is
+        the position of the request in ``requests``.
+
+        Unlike invoking a list of requests, a request that fails doesn't
+        make the rest fail too: its ``error`` is set and ``result`` is `None`.
+
+        When a flood wait occurs, all requests pause until it's over, the
+        one that caused it is retried, and fewer requests are made at once
+        (slowly going back to ``concurrency`` as requests succeed). Flood
+        waits longer than ``flood_sleep_threshold`` are reported as errors.
+
+        Requests that fail because of the connection are retried up to
+        ``retries`` times. Errors from Telegram, and requests which can't
+        be made (for example, because an entity can't be resolved), are
+        not retried, since doing so would fail the same way.
+
+        Arguments
+            requests (`iterable`):
+                The requests to make. It's consumed as they are made.
+
+            concurrency (`int`, optional):
+                How many requests may be in flight at most.
+
+            retries (`int`, optional):
+                How many times to retry a request failing to be sent.
+
+            flood_sleep_threshold (`int`, optional):
+                The longest flood wait to sleep, in seconds. By default,
+                `TelegramClient.flood_sleep_threshold` is used.
+
+        Example
+            .. code-block:: python
+
+                # Delete tens of thousands of messages from a channel
+                requests = (
+                    functions.channels.DeleteMessagesRequest(channel, ids)
+                    for ids in utils.chunks(message_ids, 100)
+                )
+                async for r in client.iter_bulk(requests):
+                    if r.error:
+                        print('Could not delete', r.request.id, r.error)
+        """
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1, not {}'.format(concurrency))
+        if flood_sleep_threshold is None:
+            flood_sleep_threshold = self.flood_sleep_threshold
+
+        loop = helpers.get_running_loop()
+        pending = enumerate(requests)
+        retry = collections.deque()  # (index, request, attempt)
+        results = asyncio.Queue()
+        allowed = concurrency  # lowered on flood waits
+        streak = 0
+        resume_at = 0
+        exhausted = False
+        woken = asyncio.Event()
+
+        async def worker(n):
+            nonlocal allowed, streak, resume_at, exhausted
+            while True:
+                # Once there are no new requests, the few left to retry are made
+                # by whoever failed them (which still waits on flood waits).
+                while n >= allowed and not exhausted:
+                    woken.clear()
+                    await woken.wait()
+
+                if retry:
+                    index, request, attempt = retry.popleft()
+                else:
+                    try:
+                        index, request = next(pending)
+                    except StopIteration:
+                        exhausted = True
+                        woken.set()
+                        return
+                    attempt = 0
+
+                delay = resume_at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                try:
+                    result = await self(request, flood_sleep_threshold=0)
+                except _FLOOD_ERRORS as e:
+                    if e.seconds > flood_sleep_threshold:
+                        results.put_nowait(BulkResult(index, request, None, e))
+                        continue
+
+                    self._log[__name__].info(*_fmt_flood(e.seconds, request))
+                    resume_at = max(resume_at, loop.time() + max(e.seconds, 1))
+                    allowed = max(1, allowed // 2)
+                    streak = 0
+                    retry.append((index, request, attempt))
+                    continue
+                except (RPCError, ValueError) as e:
+                    # Such as entities which can't be resolved, or running out
+                    # of retries in `_call`, which would only fail again
+                    results.put_nowait(BulkResult(index, request, None, e))
+                    continue
+                except (ConnectionError, asyncio.TimeoutError) as e:
+                    if attempt < retries:
+                        retry.append((index, request, attempt + 1))
+                    else:
+                        results.put_nowait(BulkResult(index, request, None, e))
+                    continue
+
+                results.put_nowait(BulkResult(index, request, result, None))
+                streak += 1
+                if allowed < concurrency and streak >= allowed:
+                    allowed += 1
+                    streak = 0
+                    woken.set()
+
+        tasks = [loop.create_task(worker(n)) for n in range(concurrency)]
+        done = loop.create_task(asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION))
+        get = None
+        try:
+            while True:
+                get = loop.create_task(results.get())
+                await asyncio.wait((get, done), return_when=asyncio.FIRST_COMPLETED)
+                if get.done():
+                    yield get.result()
+                    continue
+
+                while not results.empty():
+                    yield results.get_nowait()
+                break
+        finally:
+            outstanding = [t for t in (get, done, *tasks) if t]
+            for t in outstanding:
+                t.cancel()
+            # Wait for them so that none is destroyed while pending
+            await asyncio.gather(*outstanding, return_exceptions=True)
+
+        for t in tasks:
+            if t.done() and not t.cancelled() and t.exception():
+                raise t.exception()
+
     # endregion
 
     # region Private methods
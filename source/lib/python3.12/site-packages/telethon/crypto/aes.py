@@ -109,3 +109,17 @@ class AES:
             cipher_text.extend(cipher_text_block)
 
         return bytes(cipher_text)
+
+    @staticmethod
+    def encrypt_ige_inplace(buffer, key, iv):
+        """
+        Like `encrypt_ige`, but the cipher text overwrites the plain text
+        in the given writable `buffer`, whose length must be a multiple of 16.
+        """
+        # libssl is preferred here because it can work on the buffer itself
+        if libssl.encrypt_ige_inplace:
+            libssl.encrypt_ige_inplace(buffer, key, iv)
+        elif cryptg:
+            buffer[:] = cryptg.encrypt_ige(bytes(buffer), key, iv)
+        else:
+            buffer[:] = AES.encrypt_ige(bytes(buffer), key, iv)
@@ -82,6 +82,7 @@ except OSError as e:
 if not _libssl:
     decrypt_ige = None
     encrypt_ige = None
+    encrypt_ige_inplace = None
 else:
     # https://github.com/openssl/openssl/blob/master/include/openssl/aes.h
     AES_ENCRYPT = ctypes.c_int(1)
@@ -138,3 +139,24 @@ else:
         )
 
         return bytes(out_ptr)
+
+    def encrypt_ige_inplace(buffer, key, iv):
+        aes_key = AES_KEY()
+        key_len = ctypes.c_int(8 * len(key))
+        key = (ctypes.c_ubyte * len(key))(*key)
+        iv = (ctypes.c_ubyte * len(iv))(*iv)
+
+        # IGE supports in == out, so no copies of the buffer are needed
+        in_len = ctypes.c_size_t(len(buffer))
+        in_ptr = (ctypes.c_ubyte * len(buffer)).from_buffer(buffer)
+
+        _libssl.AES_set_encrypt_key(key, key_len, ctypes.byref(aes_key))
+        _libssl.AES_ige_encrypt(
+            ctypes.byref(in_ptr),
+            ctypes.byref(in_ptr),
+            in_len,
+            ctypes.byref(aes_key),
+            ctypes.byref(iv),
+            AES_ENCRYPT
+        )
+        del in_ptr  # release the buffer export so it can be resized again
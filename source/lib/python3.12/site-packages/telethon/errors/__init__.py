@@ -13,6 +13,35 @@ from .common import (
 # This imports the base errors too, as they're imported there
 from .rpcbaseerrors import *
 from .rpcerrorlist import *
+from . import rpcerrorlist as _rpcerrorlist
+
+# All of `rpc_errors_re` as a single pattern. Each regex is wrapped in its
+# own group, so that `lastindex` tells which one matched (the first one to
+# match is used, same as trying them one by one in order).
+# {group index: (error class, whether it captures a value)}
+_rpc_errors_groups = {}
+_i = 1
+for _regex, _cls in rpc_errors_re:
+    _groups = re.compile(_regex).groups
+    _rpc_errors_groups[_i] = (_cls, bool(_groups))
+    _i += 1 + _groups
+
+_rpc_errors_matcher = re.compile('|'.join(
+    '({})'.format(regex) for regex, _ in rpc_errors_re))
+
+del _i, _regex, _cls, _groups
+
+
+def __getattr__(name):
+    # Most errors are only created once they're used
+    try:
+        return getattr(_rpcerrorlist, name)
+    except AttributeError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+
+
+def __dir__():
+    return sorted(set(globals()) | set(dir(_rpcerrorlist)))
 
 
 def rpc_message_to_error(rpc_error, request):
@@ -29,11 +58,11 @@ def rpc_message_to_error(rpc_error, request):
     if cls:
         return cls(request=request)
 
-    for msg_regex, cls in rpc_errors_re:
-        m = re.match(msg_regex, rpc_error.error_message)
-        if m:
-            capture = int(m.group(1)) if m.groups() else None
-            return cls(request=request, capture=capture)
+    m = _rpc_errors_matcher.match(rpc_error.error_message)
+    if m:
+        cls, captures = _rpc_errors_groups[m.lastindex]
+        capture = int(m.group(m.lastindex + 1)) if captures else None
+        return cls(request=request, capture=capture)
 
     # Some errors are negative:
     # * -500 for "No workers running",
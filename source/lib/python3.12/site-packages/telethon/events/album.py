@@ -1,4 +1,3 @@
-import asyncio
 import time
 import weakref
 
@@ -39,7 +38,7 @@ class AlbumHack:
         self._event = event  # parent event
         self._due = client.loop.time() + _HACK_DELAY
 
-        client.loop.create_task(self.deliver_event())
+        client._scheduler.call_at(self._due, self.deliver_event)
 
     def extend(self, messages):
         client = self._client()
@@ -47,21 +46,19 @@ class AlbumHack:
             self._event.messages.extend(messages)
             self._due = client.loop.time() + _HACK_DELAY
 
-    async def deliver_event(self):
-        while True:
-            client = self._client()
-            if client is None:
-                return  # weakref is dead, nothing to deliver
-
-            diff = self._due - client.loop.time()
-            if diff <= 0:
-                # We've hit our due time, deliver event. It won't respect
-                # sequential updates but fixing that would just worsen this.
-                await client._dispatch_event(self._event)
-                return
+    def deliver_event(self):
+        client = self._client()
+        if client is None:
+            return  # weakref is dead, nothing to deliver
+
+        if self._due > client.loop.time():
+            # More messages arrived since, wait until our new due time
+            client._scheduler.call_at(self._due, self.deliver_event)
+            return
 
-            del client  # Clear ref and sleep until our due time
-            await asyncio.sleep(diff)
+        # We've hit our due time, deliver event. It won't respect
+        # sequential updates but fixing that would just worsen this.
+        client.loop.create_task(client._dispatch_event(self._event))
 
 
 @name_inner_event
@@ -4,6 +4,44 @@ from .common import EventBuilder, EventCommon, name_inner_event, _into_id_set
 from .. import utils
 from ..tl import types
 
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+
+def _literal_prefix(regex):
+    """
+    Returns ``(prefix, ignore_case)`` with the literal text any string
+    must start with for ``regex.match`` to succeed, or `None` if unknown.
+    """
+    if not isinstance(regex.pattern, str):
+        return None
+
+    try:
+        parsed = _sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return None
+
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+    prefix = []
+    for op, av in parsed:
+        if op is _sre_parse.AT and av in (_sre_parse.AT_BEGINNING, _sre_parse.AT_BEGINNING_STRING):
+            continue
+        if op is not _sre_parse.LITERAL:
+            break
+        char = chr(av)
+        # Case-insensitive matching of non-ASCII is too subtle to replicate
+        if ignore_case and not char.isascii():
+            break
+        prefix.append(char)
+
+    if not prefix:
+        return None
+
+    prefix = ''.join(prefix)
+    return (prefix.lower(), True) if ignore_case else (prefix, False)
+
 
 @name_inner_event
 class NewMessage(EventBuilder):
@@ -75,11 +113,17 @@ class NewMessage(EventBuilder):
         self.from_users = from_users
         self.forwards = forwards
         if isinstance(pattern, str):
-            self.pattern = re.compile(pattern).match
-        elif not pattern or callable(pattern):
+            pattern = re.compile(pattern)
+
+        # Lets the client skip this builder without running the pattern
+        # when the text doesn't start with the right prefix
+        self._pattern_prefix = None
+        if not pattern or callable(pattern):
             self.pattern = pattern
         elif hasattr(pattern, 'match') and callable(pattern.match):
             self.pattern = pattern.match
+            if isinstance(pattern, re.Pattern):
+                self._pattern_prefix = _literal_prefix(pattern)
         else:
             raise TypeError('Invalid pattern type given')
 
@@ -1,11 +1,51 @@
 import asyncio
 import collections
-import io
-import struct
 
 from ..tl import TLRequest
 from ..tl.core.messagecontainer import MessageContainer
 from ..tl.core.tlmessage import TLMessage
+from ..tl.functions import PingRequest, PingDelayDisconnectRequest, messages, upload
+
+# Priority classes, lower values are sent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+
+# Requests a user is likely waiting on to see something happen
+INTERACTIVE_REQUESTS = frozenset((
+    PingRequest.CONSTRUCTOR_ID,
+    PingDelayDisconnectRequest.CONSTRUCTOR_ID,
+    messages.SendMessageRequest.CONSTRUCTOR_ID,
+    messages.EditMessageRequest.CONSTRUCTOR_ID,
+    messages.SetTypingRequest.CONSTRUCTOR_ID,
+    messages.GetBotCallbackAnswerRequest.CONSTRUCTOR_ID,
+    messages.SetBotCallbackAnswerRequest.CONSTRUCTOR_ID,
+))
+
+# Requests which move big parts of files around
+BULK_REQUESTS = frozenset((
+    upload.GetFileRequest.CONSTRUCTOR_ID,
+    upload.GetCdnFileRequest.CONSTRUCTOR_ID,
+    upload.SaveFilePartRequest.CONSTRUCTOR_ID,
+    upload.SaveBigFilePartRequest.CONSTRUCTOR_ID,
+))
+
+
+def _priority_of(state):
+    # Ordered requests must be packed after the request they depend on,
+    # so they all take the priority of the first request in the chain.
+    while state.after:
+        state = state.after
+
+    request = state.request
+    if not isinstance(request, TLRequest):
+        # Service messages (acks, state info...)
+        return PRIORITY_INTERACTIVE
+    if request.CONSTRUCTOR_ID in INTERACTIVE_REQUESTS:
+        return PRIORITY_INTERACTIVE
+    if request.CONSTRUCTOR_ID in BULK_REQUESTS:
+        return PRIORITY_BULK
+    return PRIORITY_NORMAL
 
 
 class MessagePacker:
@@ -20,41 +60,114 @@ class MessagePacker:
     This addresses several needs: outgoing messages will be smaller, so the
     encryption and network overhead also is smaller. It's also a central
     point where outgoing requests are put, and where ready-messages are get.
+
+    Requests are queued by priority class (interactive, normal and bulk),
+    so that a backlog of file parts doesn't delay sending a message. If a
+    ``batch_window`` is given (in microseconds), the packer waits for that
+    long before packing a batch which would not fill a container, so that
+    bursts of small requests can be sent together.
     """
 
-    def __init__(self, state, loggers):
+    def __init__(self, state, loggers, batch_window=0):
         self._state = state
-        self._deque = collections.deque()
+        self._deques = (collections.deque(), collections.deque(), collections.deque())
+        self._size = 0
         self._ready = asyncio.Event()
         self._log = loggers[__name__]
+        self._batch_window = max(batch_window or 0, 0) / 1000000
+
+        # Statistics about the batches sent so far
+        self._batch_count = 0
+        self._message_count = 0
+        self._byte_count = 0
+
+    def __len__(self):
+        return sum(len(d) for d in self._deques)
 
     def append(self, state):
-        self._deque.append(state)
+        self._deques[_priority_of(state)].append(state)
+        self._size += len(state.data) + TLMessage.SIZE_OVERHEAD
         self._ready.set()
 
     def extend(self, states):
-        self._deque.extend(states)
+        for state in states:
+            self._deques[_priority_of(state)].append(state)
+            self._size += len(state.data) + TLMessage.SIZE_OVERHEAD
         self._ready.set()
 
+    @property
+    def average_fill(self):
+        """
+        Average fraction (between 0 and 1) of ``MessageContainer.MAXIMUM_SIZE``
+        used by the batches returned so far.
+        """
+        if not self._batch_count:
+            return 0.0
+        return self._byte_count / (self._batch_count * MessageContainer.MAXIMUM_SIZE)
+
+    @property
+    def average_length(self):
+        """
+        Average amount of messages in the batches returned so far.
+        """
+        if not self._batch_count:
+            return 0.0
+        return self._message_count / self._batch_count
+
+    def stats(self):
+        """
+        Returns a `dict` with how many batches, messages and bytes were
+        returned so far, and the `average_fill` and `average_length`.
+        """
+        return {
+            'batches': self._batch_count,
+            'messages': self._message_count,
+            'bytes': self._byte_count,
+            'average_fill': self.average_fill,
+            'average_length': self.average_length,
+        }
+
+    def _popleft(self):
+        for deque in self._deques:
+            if deque:
+                state = deque.popleft()
+                self._size -= len(state.data) + TLMessage.SIZE_OVERHEAD
+                return state
+
+    def _appendleft(self, state):
+        self._deques[_priority_of(state)].appendleft(state)
+        self._size += len(state.data) + TLMessage.SIZE_OVERHEAD
+
     async def get(self):
         """
         Returns (batch, data) if one or more items could be retrieved.
 
+        The data is a ``bytearray`` with room reserved at the start for
+        ``MTProtoState.encrypt_message_buffer``, so that the whole batch can
+        be serialized, encrypted and sent without further copies.
+
         If the cancellation occurs or only invalid items were in the
         queue, (None, None) will be returned instead.
         """
-        if not self._deque:
+        if not self._size:
             self._ready.clear()
             await self._ready.wait()
 
-        buffer = io.BytesIO()
+        if self._batch_window and self._size < MessageContainer.MAXIMUM_SIZE:
+            # Give other requests a chance to join this batch
+            await asyncio.sleep(self._batch_window)
+
+        # Messages are written after enough room for the encryption header
+        # and the container header, in case more than one message is packed.
+        reserved = self._state.ENCRYPTION_HEADER_SIZE + self._state.CONTAINER_HEADER_SIZE
+        buffer = bytearray(reserved)
         batch = []
         size = 0
 
         # Fill a new batch to return while the size is small enough,
         # as long as we don't exceed the maximum length of messages.
-        while self._deque and len(batch) <= MessageContainer.MAXIMUM_LENGTH:
-            state = self._deque.popleft()
+        while self._size and len(batch) <= MessageContainer.MAXIMUM_LENGTH:
+            state = self._popleft()
             size += len(state.data) + TLMessage.SIZE_OVERHEAD
 
             if size <= MessageContainer.MAXIMUM_SIZE:
@@ -70,7 +183,7 @@ class MessagePacker:
 
             if batch:
                 # Put the item back since it can't be sent in this batch
-                self._deque.appendleft(state)
+                self._appendleft(state)
                 break
 
             # If a single message exceeds the maximum size, then the
@@ -96,16 +209,17 @@ class MessagePacker:
             return None, None
 
         if len(batch) > 1:
-            # Inlined code to pack several messages into a container
-            data = struct.pack(
-                '<Ii', MessageContainer.CONSTRUCTOR_ID, len(batch)
-            ) + buffer.getvalue()
-            buffer = io.BytesIO()
-            container_id = self._state.write_data_as_message(
-                buffer, data, content_related=False
-            )
+            # Fill the room reserved before the messages to make a container
+            container_id = self._state.write_container_header(
+                buffer, self._state.ENCRYPTION_HEADER_SIZE, len(batch))
             for s in batch:
                 s.container_id = container_id
-
-        data = buffer.getvalue()
-        return batch, data
+        else:
+            # Deleting from the start of a bytearray does not move the data
+            del buffer[:self._state.CONTAINER_HEADER_SIZE]
+            batch[0].container_id = None
+
+        self._batch_count += 1
+        self._message_count += len(batch)
+        self._byte_count += len(buffer) - self._state.ENCRYPTION_HEADER_SIZE
+        return batch, buffer
@@ -0,0 +1,136 @@
+import asyncio
+import heapq
+import itertools
+
+from .. import helpers
+
+
+class ScheduledCall:
+    """
+    Handle to a callback registered with `Scheduler`, which
+    can be cancelled as long as the callback has not run yet.
+    """
+    __slots__ = ('when', 'callback', 'args', 'cancelled')
+
+    def __init__(self, when, callback, args):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        self.callback = self.args = None
+
+
+class Scheduler:
+    """
+    This class runs callbacks once their deadline is reached.
+
+    All the deadlines are kept in a heap, and a single timer in the
+    event loop is armed for the earliest one. This way, delivering
+    albums or timing out conversations does not need a sleeping task
+    or a separate timer for each of them.
+
+    Deadlines use the clock of the event loop (``loop.time()``).
+    """
+    def __init__(self, loggers):
+        self._log = loggers[__name__]
+        self._heap = []
+        self._counter = itertools.count()
+        self._timer = None
+        self._timer_when = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def call_at(self, when, callback, *args):
+        """
+        Schedules ``callback(*args)`` to run at ``when``.
+        """
+        call = ScheduledCall(when, callback, args)
+        heapq.heappush(self._heap, (when, next(self._counter), call))
+        if self._timer_when is None or when < self._timer_when:
+            self._arm()
+        return call
+
+    def call_later(self, delay, callback, *args):
+        """
+        Schedules ``callback(*args)`` to run after ``delay`` seconds.
+        """
+        return self.call_at(helpers.get_running_loop().time() + delay, callback, *args)
+
+    async def wait_for(self, future, timeout):
+        """
+        Like ``asyncio.wait_for``, but the timeout is driven by this
+        scheduler. The future is cancelled if the timeout occurs.
+        """
+        if timeout is None:
+            return await future
+
+        timed_out = False
+
+        def on_timeout():
+            nonlocal timed_out
+            if not future.done():
+                timed_out = True
+                future.cancel()
+
+        call = self.call_later(timeout, on_timeout)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if timed_out:
+                raise asyncio.TimeoutError() from None
+            raise
+        finally:
+            call.cancel()
+
+    def clear(self):
+        """
+        Cancels all the scheduled calls and the timer, without running them.
+
+        The timeouts of `wait_for` are cancelled too, so whoever owns the
+        futures being waited on should cancel them, or they will wait forever.
+        """
+        if self._timer:
+            self._timer.cancel()
+        self._timer = self._timer_when = None
+
+        heap, self._heap = self._heap, []
+        for _, _, call in heap:
+            call.cancel()
+
+    def _arm(self):
+        if self._timer:
+            self._timer.cancel()
+
+        # Cancelled calls are only removed once they reach the top
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+
+        if self._heap:
+            self._timer_when = self._heap[0][0]
+            self._timer = helpers.get_running_loop().call_at(self._timer_when, self._run)
+        else:
+            self._timer = self._timer_when = None
+
+    def _run(self):
+        self._timer = self._timer_when = None
+        # The loop may run timers up to its clock resolution early
+        loop = helpers.get_running_loop()
+        now = loop.time() + getattr(loop, '_clock_resolution', 0)
+        while self._heap and self._heap[0][0] <= now:
+            _, _, call = heapq.heappop(self._heap)
+            if call.cancelled:
+                continue
+
+            callback, args = call.callback, call.args
+            call.cancel()  # it already ran, so it can't be cancelled
+            try:
+                callback(*args)
+            except Exception:
+                self._log.exception('Unhandled exception on scheduled %s', callback)
+
+        if self._timer is None:
+            self._arm()
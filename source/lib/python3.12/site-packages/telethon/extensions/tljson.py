@@ -0,0 +1,116 @@
+"""
+Encoder to turn `TLObject` into compact JSON without going through
+`TLObject.to_dict`, so that no intermediate dictionaries are built.
+
+The output is the same as ``json.dumps(obj.to_dict(), separators=(',', ':'),
+default=...)`` would produce with the default of `TLObject.to_json`.
+"""
+import base64
+import json
+from datetime import datetime
+from operator import attrgetter
+
+from ..tl.tlobject import TLObject, _json_default, _fields_of
+
+_fallback = json.JSONEncoder(separators=(',', ':'), default=_json_default).encode
+
+
+def _encode_list(value):
+    return '[' + ','.join(map(_encode, value)) + ']'
+
+
+def _encode_bytes(value):
+    return '"' + base64.b64encode(value).decode('ascii') + '"'
+
+
+def _encode_datetime(value):
+    return '"' + value.isoformat() + '"'
+
+
+def _encode_other(value):
+    if isinstance(value, TLObject):
+        encoder = _ENCODERS[type(value)] = _make_encoder(type(value))
+        return encoder(value)
+
+    # Floats and anything unexpected are rare enough to use the slow path
+    return _fallback(value)
+
+
+# Encoder for each type of value, with the encoders of the `TLObject`
+# classes added as they are found
+_ENCODERS = {
+    str: json.encoder.encode_basestring_ascii,
+    int: int.__repr__,
+    bool: {True: 'true', False: 'false'}.__getitem__,
+    type(None): lambda value: 'null',
+    list: _encode_list,
+    bytes: _encode_bytes,
+    datetime: _encode_datetime,
+}
+
+
+def _encode(value):
+    return _ENCODERS.get(type(value), _encode_other)(value)
+
+
+def _make_encoder(cls):
+    # Calling `to_dict` on an instance with every field set to `None` tells
+    # us the name, the fields in order, and which of them are vectors (they
+    # become ``[]`` when `None`), without having to know the TL definition.
+    fields = _fields_of(cls)
+    if fields is None:
+        return _encode_dict
+
+    instance = cls.__new__(cls)
+    try:
+        for name in fields:
+            setattr(instance, name, None)
+        d = instance.to_dict()
+    except Exception:
+        return _encode_dict
+
+    # The keys are constant, so the text around the values is a template,
+    # and all the fields are read at once with a precomputed getter.
+    template = '{"_":' + _fallback(d.pop('_')).replace('%', '%%')
+    vectors = []
+    for i, (name, value) in enumerate(d.items()):
+        template += ',' + _fallback(name).replace('%', '%%') + ':%s'
+        if value == []:
+            vectors.append(i)
+    template += '}'
+    if not d:
+        text = template % ()
+        return lambda obj: text
+
+    getter = attrgetter(*d)
+    if len(d) == 1:
+        # With a single name, the value is not returned in a tuple
+        single = getter
+        getter = lambda obj: (single(obj),)
+
+    # The lookup done by `_encode` is inlined to save a call per value,
+    # and most fields are usually `None`, so those don't need a call either
+    get = _ENCODERS.get
+
+    def encode(obj):
+        values = getter(obj)
+        out = ['null' if value is None else get(type(value), _encode_other)(value)
+               for value in values]
+        for i in vectors:
+            if values[i] is None:
+                out[i] = '[]'
+        return template % tuple(out)
+
+    return encode
+
+
+def _encode_dict(obj):
+    return _fallback(obj.to_dict())
+
+
+def dumps(obj):
+    """
+    Returns the compact JSON representation of the given `TLObject`
+    (or list of them, or any value that may appear inside of one).
+    """
+    return _encode(obj)
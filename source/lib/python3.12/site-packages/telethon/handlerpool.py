@@ -0,0 +1,233 @@
+"""
+Running CPU-bound event handlers in other processes, so that they
+don't block the event loop (and with it, every other handler and the
+connection itself).
+"""
+import asyncio
+import concurrent.futures
+import inspect
+import os
+
+from . import helpers
+from .extensions import BinaryReader
+from .tl.tlobject import TLObject
+
+
+class Action:
+    """
+    Something to do with the event once a handler running in a
+    `HandlerPool` returns, such as replying to it.
+
+    When applied, the method named ``method`` is called on the event
+    with the given arguments, so any method of the event can be used.
+
+    Example
+        .. code-block:: python
+
+            from telethon.handlerpool import Action
+
+            @client.on(events.NewMessage, executor='process')
+            def handler(message):
+                words = len(message.raw_text.split())
+                return Action('reply', 'That was {} words'.format(words))
+    """
+    __slots__ = ('method', 'args', 'kwargs')
+
+    def __init__(self, method, *args, **kwargs):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+
+    def __getstate__(self):
+        return self.method, self.args, self.kwargs
+
+    def __setstate__(self, state):
+        self.method, self.args, self.kwargs = state
+
+    def __repr__(self):
+        return 'Action({!r}, *{!r}, **{!r})'.format(self.method, self.args, self.kwargs)
+
+    async def apply(self, event):
+        """
+        Calls the method of this action on the given event.
+        """
+        result = getattr(event, self.method)(*self.args, **self.kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+
+def _run_in_worker(callback, data):
+    # This runs in the worker process. Only the raw bytes of the TL object
+    # travel there, since they are cheap to pickle and hold no client.
+    with BinaryReader(data) as reader:
+        obj = reader.tgread_object()
+    return callback(obj)
+
+
+class HandlerPool:
+    """
+    Runs event handlers in a process pool, with at most ``max_concurrency``
+    of them running at once. Events wait in order for a free slot, and
+    if ``max_queued`` are already waiting, new events are dropped.
+
+    The handlers must be regular (not ``async``) functions defined at
+    the top level of a module, so they can be pickled. They are called
+    with the :tl:`Message` of message events, or with the :tl:`Update` of
+    other events. The message has no client, so it can't make requests,
+    but it can return an `Action` (or a list of them) to be applied to the
+    event once it's back in this process.
+
+    A pool shared by all the handlers of a client is used with
+    ``executor='process'``, but custom pools can also be given.
+
+    Arguments
+        max_workers (`int`, optional):
+            How many processes to use. Defaults to the amount of CPUs.
+
+        max_concurrency (`int`, optional):
+            How many handlers may be running at once. Defaults to
+            ``max_workers`` (or the amount of CPUs).
+
+        max_queued (`int`, optional):
+            How many events may wait for a free slot before dropping
+            new ones. By default there is no limit.
+
+        executor (`concurrent.futures.Executor`, optional):
+            The executor to use instead of creating a process pool.
+    """
+    def __init__(self, max_workers=None, *, max_concurrency=None,
+                 max_queued=None, executor=None):
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers or os.cpu_count() or 1
+        self.max_queued = max_queued
+        self._executor = executor
+        self._own_executor = executor is None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.max_queued_seen = 0
+        self.queue_time = 0.0
+        self.run_time = 0.0
+
+    def stats(self):
+        """
+        Returns a `dict` with how many events are queued and running right
+        now, how many completed, failed or were dropped, the largest queue
+        seen, and the total seconds events spent queued and running.
+        """
+        return {
+            'queued': self.queued,
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'max_queued': self.max_queued_seen,
+            'queue_time': self.queue_time,
+            'run_time': self.run_time,
+        }
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(self.max_workers)
+        return self._executor
+
+    async def run(self, callback, obj):
+        """
+        Runs ``callback(obj)`` in the pool and returns the list of actions
+        it returned, or `None` if the event was dropped.
+        """
+        if self.max_queued is not None and self.queued >= self.max_queued:
+            self.dropped += 1
+            return None
+
+        loop = helpers.get_running_loop()
+        start = loop.time()
+        self.queued += 1
+        self.max_queued_seen = max(self.max_queued_seen, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        started = loop.time()
+        self.queue_time += started - start
+        self.running += 1
+        try:
+            result = await loop.run_in_executor(
+                self._get_executor(), _run_in_worker, callback, bytes(obj))
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self.run_time += loop.time() - started
+            self._semaphore.release()
+
+        self.completed += 1
+        if result is None:
+            return []
+        elif isinstance(result, Action):
+            return [result]
+        elif isinstance(result, (list, tuple)) and all(isinstance(a, Action) for a in result):
+            return list(result)
+        else:
+            raise TypeError('handlers in a HandlerPool must return Action, '
+                            'a list of Action or None, not {!r}'.format(result))
+
+    def shutdown(self, wait=True):
+        """
+        Shuts down the process pool if it was created by this instance.
+        A new one will be created if more events need to run later.
+        """
+        if self._own_executor and self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+class _PoolCallback:
+    """
+    Event handler which runs ``callback`` in a `HandlerPool`.
+    It compares equal to ``callback`` so that it can be removed.
+    """
+    def __init__(self, client, callback, pool):
+        if inspect.iscoroutinefunction(callback):
+            raise TypeError('handlers which run in a process pool cannot be async')
+
+        self.client = client
+        self.callback = callback
+        self.pool = pool
+        self.__name__ = getattr(callback, '__name__', repr(callback))
+
+    def __eq__(self, other):
+        return self is other or self.callback == other
+
+    def __hash__(self):
+        return hash(self.callback)
+
+    async def __call__(self, event):
+        if isinstance(self.pool, HandlerPool):
+            pool = self.pool
+        else:
+            pool = self.client._get_handler_pool()
+
+        if isinstance(event, TLObject):
+            obj = event
+        else:
+            obj = getattr(event, 'message', None)
+            if not isinstance(obj, TLObject):
+                obj = event.original_update
+
+        actions = await pool.run(self.callback, obj)
+        if actions is None:
+            self.client._log[__name__].warning(
+                'Too many events queued for %s, dropping %s',
+                self.__name__, type(event).__name__)
+            return
+
+        for action in actions:
+            await action.apply(event)
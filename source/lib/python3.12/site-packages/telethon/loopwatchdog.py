@@ -0,0 +1,207 @@
+"""
+Detection of the moments in which the event loop is blocked, which
+delay everything else (including the pings that keep the connection
+alive), and of what was running when they happened.
+"""
+import asyncio
+import collections
+import os
+import sys
+import threading
+import traceback
+
+# asyncio's own frames, skipped when looking for who blocked the loop
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+
+class LoopWatchdog:
+    """
+    Measures how late the event loop runs a callback scheduled every
+    ``interval`` seconds. Any lateness over ``threshold`` seconds is
+    a stall, which is logged as a warning.
+
+    To know who caused the stall, a background thread looks at what the
+    event loop thread is running once the stall exceeds ``threshold``.
+    The stall is attributed to the event handler found in that stack
+    (by its name), or else to the outermost coroutine, and the warning
+    says which line was running. If ``sample_stacks`` is `True`, the
+    whole stack is also included in the warning.
+
+    Every ``report_interval`` seconds, a summary of the stalls since the
+    last one is logged, and `stats` can be used to get all of them.
+
+    The overhead is one callback in the event loop and one wake-up of
+    the thread every ``interval`` seconds, so it can be left running.
+    """
+    def __init__(self, threshold=0.1, *, interval=None, sample_stacks=False,
+                 report_interval=60):
+        if interval is None:
+            interval = threshold / 2
+        if not threshold > 0:
+            raise ValueError('threshold must be positive, not {}'.format(threshold))
+        if not interval > 0:
+            raise ValueError('interval must be positive, not {}'.format(interval))
+
+        self.threshold = threshold
+        self.interval = interval
+        self.sample_stacks = sample_stacks
+        self.report_interval = report_interval
+
+        self.stalls = 0
+        self.stalled_time = 0.0
+        self.max_lag = 0.0
+        self.culprits = collections.Counter()
+
+        self._log = None
+        self._loop = None
+        self._get_handlers = None
+        self._handle = None
+        self._thread = None
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._expected = 0.0
+        self._sample = None
+        self._report = None
+
+    def start(self, loop, loggers, get_handlers):
+        """
+        Starts watching the given loop, which must be the running one.
+        ``get_handlers`` should return the ``(builder, callback)`` pairs
+        of the event handlers, to be able to tell them apart.
+        """
+        if self._loop is not None:
+            return
+
+        self._log = loggers[__name__]
+        self._loop = loop
+        self._get_handlers = get_handlers
+        self._thread_id = threading.get_ident()
+        self._report = _Report(loop.time())
+        self._stop.clear()
+        self._expected = loop.time() + self.interval
+        self._handle = loop.call_at(self._expected, self._tick)
+        self._thread = threading.Thread(
+            target=self._watch, name='LoopWatchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops watching the loop.
+        """
+        if self._loop is None:
+            return
+
+        self._stop.set()
+        self._handle.cancel()
+        self._thread.join()
+        self._loop = self._handle = self._thread = None
+
+    def stats(self):
+        """
+        Returns a `dict` with the amount of stalls, the total and maximum
+        seconds the loop was stalled, and how many stalls each culprit
+        caused (`None` for those which ended before it was known).
+        """
+        return {
+            'stalls': self.stalls,
+            'stalled_time': self.stalled_time,
+            'max_lag': self.max_lag,
+            'culprits': dict(self.culprits),
+        }
+
+    def _tick(self):
+        now = self._loop.time()
+        lag = now - self._expected
+        if lag > self.threshold:
+            self._on_stall(lag)
+
+        report = self._report
+        if now - report.start >= self.report_interval:
+            if report.stalls:
+                self._log.info(
+                    'Event loop stalled %d times in the last %.0fs (%.3fs in total, '
+                    'up to %.3fs); most stalls by: %s', report.stalls, now - report.start,
+                    report.stalled_time, report.max_lag,
+                    ', '.join('{} ({})'.format(c, n) for c, n in report.culprits.most_common(3)))
+            self._report = _Report(now)
+
+        self._expected = now + self.interval
+        self._handle = self._loop.call_at(self._expected, self._tick)
+
+    def _on_stall(self, lag):
+        sample, self._sample = self._sample, None
+        culprit, where, stack = sample or (None, None, None)
+
+        self.stalls += 1
+        self.stalled_time += lag
+        self.max_lag = max(self.max_lag, lag)
+        self.culprits[culprit] += 1
+        self._report.add(lag, culprit)
+
+        if stack:
+            self._log.warning('Event loop was blocked for %.3fs by %s, at %s:\n%s',
+                              lag, culprit, where, ''.join(stack))
+        elif culprit:
+            self._log.warning('Event loop was blocked for %.3fs by %s, at %s',
+                              lag, culprit, where)
+        else:
+            self._log.warning('Event loop was blocked for %.3fs', lag)
+
+    def _watch(self):
+        # Runs in a separate thread. ``_expected`` is only written by the loop, so
+        # there's no need for locks: the worst case is a missed sample.
+        sampled = None
+        while not self._stop.wait(self.interval):
+            expected = self._expected
+            if sampled != expected and self._loop.time() - expected > self.threshold:
+                frame = sys._current_frames().get(self._thread_id)
+                if frame is not None:
+                    self._sample = self._blame(frame)
+                    sampled = expected
+                del frame
+
+    def _blame(self, frame):
+        handlers = {}
+        for _, callback in list(self._get_handlers()):
+            callback = getattr(callback, 'callback', callback)
+            code = getattr(getattr(callback, '__func__', callback), '__code__', None)
+            if code is not None:
+                handlers[code] = getattr(callback, '__name__', repr(callback))
+
+        culprit = None
+        outermost = None
+        f = frame
+        while f is not None:
+            code = f.f_code
+            if culprit is None and code in handlers:
+                culprit = 'handler ' + handlers[code]
+            if not code.co_filename.startswith(_ASYNCIO_DIR):
+                outermost = code
+            elif outermost is not None:
+                break  # asyncio calls the coroutine from here on
+            f = f.f_back
+
+        if culprit is None and outermost is not None:
+            culprit = getattr(outermost, 'co_qualname', outermost.co_name)
+
+        where = '{}:{} in {}'.format(
+            os.path.basename(frame.f_code.co_filename), frame.f_lineno, frame.f_code.co_name)
+        stack = traceback.format_stack(frame) if self.sample_stacks else None
+        return culprit, where, stack
+
+
+class _Report:
+    __slots__ = ('start', 'stalls', 'stalled_time', 'max_lag', 'culprits')
+
+    def __init__(self, start):
+        self.start = start
+        self.stalls = 0
+        self.stalled_time = 0.0
+        self.max_lag = 0.0
+        self.culprits = collections.Counter()
+
+    def add(self, lag, culprit):
+        self.stalls += 1
+        self.stalled_time += lag
+        self.max_lag = max(self.max_lag, lag)
+        self.culprits[culprit] += 1
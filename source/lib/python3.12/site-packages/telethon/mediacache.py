@@ -0,0 +1,146 @@
+"""
+On-disk cache for downloaded media, so that downloading the same
+photo or document again doesn't need to reach Telegram.
+"""
+import collections
+import os
+import shutil
+
+# Suffix of the files which are still being downloaded
+_PART_SUFFIX = '.part'
+
+
+class MediaCache:
+    """
+    Stores the downloaded photos and documents as files inside of
+    ``directory``, named after their ID, size type and data center.
+
+    The files are evicted least-recently-used first when the total
+    size of the cache goes over ``max_bytes``. Files which were not
+    fully downloaded are kept (and count towards the size) so that
+    downloading them again can resume where it was left.
+
+    Cached files are hard-linked to the output path when possible,
+    so they should not be modified in-place by whoever downloads them.
+    """
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+        # {file name: size}, from least to most recently used
+        self._files = collections.OrderedDict()
+        self._size = 0
+        self._in_progress = set()
+
+        entries = sorted(
+            (e.stat().st_mtime, e.name, e.stat().st_size)
+            for e in os.scandir(self.directory) if e.is_file()
+        )
+        for _, name, size in entries:
+            self._files[name] = size
+            self._size += size
+
+    @staticmethod
+    def _name(key):
+        return '_'.join(map(str, key))
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def get(self, key):
+        """
+        Returns the path to the cached file for ``key``, or `None`
+        if it has not been fully downloaded yet.
+        """
+        name = self._name(key)
+        if name not in self._files:
+            return None
+
+        path = self._path(name)
+        try:
+            os.utime(path)  # so the order is remembered across runs
+        except FileNotFoundError:
+            self._forget(name)
+            return None
+
+        self._files.move_to_end(name)
+        return path
+
+    def begin(self, key, part_size):
+        """
+        Starts downloading the file for ``key``. Returns the path of the
+        partial file and the offset from which the download should resume
+        (a multiple of ``part_size``), or `None` if the same file is
+        already being downloaded.
+        """
+        name = self._name(key) + _PART_SUFFIX
+        if name in self._in_progress:
+            return None
+
+        path = self._path(name)
+        try:
+            offset = os.path.getsize(path)
+        except FileNotFoundError:
+            offset = 0
+
+        # Whatever comes after the last complete part may be garbage
+        if offset % part_size:
+            offset -= offset % part_size
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+
+        self._in_progress.add(name)
+        self._forget(name)
+        return path, offset
+
+    def end(self, key, done):
+        """
+        Finishes downloading the file for ``key``, which becomes available
+        through `get` if it is ``done``. Otherwise, the partial file is kept.
+        """
+        name = self._name(key)
+        part_name = name + _PART_SUFFIX
+        self._in_progress.discard(part_name)
+        part_path = self._path(part_name)
+        try:
+            size = os.path.getsize(part_path)
+        except FileNotFoundError:
+            return
+
+        if done:
+            os.replace(part_path, self._path(name))
+            self._forget(name)
+        else:
+            name = part_name
+
+        self._files[name] = size
+        self._size += size
+        self._evict()
+
+    def _forget(self, name):
+        size = self._files.pop(name, None)
+        if size is not None:
+            self._size -= size
+
+    def _evict(self):
+        while self._size > self.max_bytes and len(self._files) > 1:
+            name, size = self._files.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def copy(path, file):
+        """
+        Copies the cached file at ``path`` to the output path ``file``,
+        with a hard link if possible.
+        """
+        tmp = file + _PART_SUFFIX
+        try:
+            os.link(path, tmp)
+        except OSError:
+            shutil.copyfile(path, tmp)
+        os.replace(tmp, file)
@@ -0,0 +1,169 @@
+"""
+On-disk storage for the messages fetched by the client, so that asking
+for the same messages by ID again doesn't need to reach Telegram.
+"""
+from . import utils
+from .extensions import BinaryReader
+from .tl import types
+
+try:
+    import sqlite3
+    sqlite3_err = None
+except ImportError as e:
+    sqlite3 = None
+    sqlite3_err = type(e)
+
+# Marked IDs of channels are below this value (see `utils.get_peer_id`)
+_MIN_NON_CHANNEL_ID = -1000000000000
+
+# SQLite can't take an unlimited amount of parameters in a single query
+_MAX_PARAMS = 500
+
+
+class MessageStore:
+    """
+    Stores the raw bytes of :tl:`Message` and :tl:`MessageService`
+    in a SQLite database, indexed by their chat and ID.
+
+    Outside of channels, message IDs are only unique per account, so the
+    messages are also indexed by the ID of the account they belong to
+    (``owner_id``, the ID of the logged-in user). This way, the same
+    instance can be used by several clients. Nothing is stored or found
+    while the ``owner_id`` is `None` (if the account isn't known yet).
+
+    Only the most recently stored ``max_messages`` are kept; older
+    messages are evicted as new ones come in. Messages are kept up to
+    date with the edit and delete updates the client receives.
+
+    Like the session, changes are only committed to disk periodically
+    and when the client disconnects.
+    """
+    def __init__(self, filename, max_messages=100000):
+        if sqlite3 is None:
+            raise sqlite3_err
+
+        self.filename = str(filename)
+        self.max_messages = max_messages
+        self._conn = sqlite3.connect(self.filename, check_same_thread=False)
+
+        # Stores made before messages were kept per account can't tell
+        # whose messages they are, but they're only a cache, so drop them
+        columns = [row[1] for row in self._conn.execute("pragma table_info(messages)")]
+        if columns and 'owner_id' not in columns:
+            self._conn.execute("drop table messages")
+
+        self._conn.execute(
+            "create table if not exists messages ("
+            "owner_id integer not null, chat_id integer not null, "
+            "id integer not null, data blob not null)")
+        self._conn.execute(
+            "create unique index if not exists messages_owner_chat_id "
+            "on messages (owner_id, chat_id, id)")
+
+    def get_messages(self, owner_id, chat_id, ids):
+        """
+        Returns ``{message_id: (chat_id, message)}`` for the given IDs
+        which are stored. If ``chat_id`` is `None`, the messages are looked
+        up in all chats except channels (where IDs are unique per account).
+        """
+        result = {}
+        if owner_id is None:
+            return result
+
+        for i in range(0, len(ids), _MAX_PARAMS):
+            chunk = ids[i:i + _MAX_PARAMS]
+            marks = ','.join('?' * len(chunk))
+            if chat_id is None:
+                rows = self._conn.execute(
+                    "select chat_id, id, data from messages where owner_id = ? "
+                    "and chat_id > ? and id in ({})".format(marks),
+                    (owner_id, _MIN_NON_CHANNEL_ID, *chunk))
+            else:
+                rows = self._conn.execute(
+                    "select chat_id, id, data from messages where owner_id = ? "
+                    "and chat_id = ? and id in ({})".format(marks),
+                    (owner_id, chat_id, *chunk))
+
+            for row_chat_id, message_id, data in rows:
+                with BinaryReader(data) as reader:
+                    message = reader.tgread_object()
+                result[message_id] = (row_chat_id, message)
+
+        return result
+
+    def put_messages(self, owner_id, messages):
+        """
+        Stores the given messages (replacing them if already stored),
+        and evicts the oldest ones if there are too many.
+        """
+        if owner_id is None:
+            return
+
+        rows = [
+            (owner_id, utils.get_peer_id(m.peer_id), m.id, bytes(m))
+            for m in messages
+            if not isinstance(m, types.MessageEmpty) and m.peer_id
+        ]
+        if not rows:
+            return
+
+        # Replacing a row gives it a new (higher) rowid, so the rowid
+        # tells which messages were stored most recently.
+        self._conn.executemany(
+            "insert or replace into messages values (?,?,?,?)", rows)
+        self._conn.execute(
+            "delete from messages where rowid <= "
+            "(select max(rowid) from messages) - ?", (self.max_messages,))
+
+    def edit_message(self, owner_id, message):
+        """
+        Replaces the given message if it was stored.
+        """
+        self._conn.execute(
+            "update messages set data = ? where owner_id = ? and chat_id = ? and id = ?",
+            (bytes(message), owner_id, utils.get_peer_id(message.peer_id), message.id))
+
+    def delete_messages(self, owner_id, channel_id, ids):
+        """
+        Deletes the given message IDs. If ``channel_id`` is `None`, they
+        are deleted from every chat except channels.
+        """
+        for i in range(0, len(ids), _MAX_PARAMS):
+            chunk = ids[i:i + _MAX_PARAMS]
+            marks = ','.join('?' * len(chunk))
+            if channel_id is None:
+                self._conn.execute(
+                    "delete from messages where owner_id = ? and chat_id > ? "
+                    "and id in ({})".format(marks), (owner_id, _MIN_NON_CHANNEL_ID, *chunk))
+            else:
+                self._conn.execute(
+                    "delete from messages where owner_id = ? and chat_id = ? "
+                    "and id in ({})".format(marks),
+                    (owner_id, utils.get_peer_id(types.PeerChannel(channel_id)), *chunk))
+
+    def process_updates(self, owner_id, updates):
+        """
+        Applies the edits and deletions found in the given updates.
+        """
+        for update in updates:
+            if isinstance(update, (
+                    types.UpdateEditMessage, types.UpdateEditChannelMessage)):
+                if not isinstance(update.message, types.MessageEmpty):
+                    self.edit_message(owner_id, update.message)
+            elif isinstance(update, types.UpdateDeleteMessages):
+                self.delete_messages(owner_id, None, update.messages)
+            elif isinstance(update, types.UpdateDeleteChannelMessages):
+                self.delete_messages(owner_id, update.channel_id, update.messages)
+
+    def save(self):
+        """
+        Commits the pending changes to disk.
+        """
+        self._conn.commit()
+
+    def close(self):
+        """
+        Commits the pending changes and closes the database.
+        """
+        self._conn.commit()
+        self._conn.close()
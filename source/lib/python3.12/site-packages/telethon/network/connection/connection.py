@@ -374,7 +374,7 @@ class Connection(abc.ABC):
             self._writer.write(self._codec.tag)
 
     def _send(self, data):
-        self._writer.write(self._codec.encode_packet(data))
+        self._writer.writelines(self._codec.encode_packet_parts(data))
 
     async def _recv(self):
         return await self._codec.read_packet(self._reader)
@@ -431,6 +431,14 @@ class PacketCodec(abc.ABC):
         """
         raise NotImplementedError
 
+    def encode_packet_parts(self, data):
+        """
+        Like `encode_packet`, but returns a sequence of byte strings which
+        together make up the encoded packet. Codecs can override this to
+        avoid copying `data` into a new bytestring only to prepend a header.
+        """
+        return (self.encode_packet(data),)
+
     @abc.abstractmethod
     async def read_packet(self, reader):
         """
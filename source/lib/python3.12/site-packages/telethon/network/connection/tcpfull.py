@@ -21,6 +21,13 @@ class FullPacketCodec(PacketCodec):
         self._send_counter += 1
         return data + crc
 
+    def encode_packet_parts(self, data):
+        length = len(data) + 12
+        header = struct.pack('<ii', length, self._send_counter)
+        crc = struct.pack('<I', crc32(data, crc32(header)))
+        self._send_counter += 1
+        return header, data, crc
+
     async def read_packet(self, reader):
         packet_len_seq = await reader.readexactly(8)  # 4 and 4
         packet_len, seq = struct.unpack('<ii', packet_len_seq)
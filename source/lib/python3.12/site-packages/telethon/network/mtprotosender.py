@@ -1,5 +1,6 @@
 import asyncio
 import collections
+import functools
 import struct
 import datetime
 import time
@@ -30,6 +31,59 @@ from ..crypto import AuthKey
 from ..helpers import retry_range
 
 
+class _PendingStates:
+    """
+    Holds the sent states which are awaiting a response, indexed both by
+    their ``msg_id`` and by the ``container_id`` they were sent in, so that
+    acknowledgements, results and resends never need to scan all of them.
+    """
+    def __init__(self):
+        self._by_msg_id = {}
+        self._by_container_id = {}
+
+    def __len__(self):
+        return len(self._by_msg_id)
+
+    def add(self, state):
+        self._by_msg_id[state.msg_id] = state
+        if state.container_id is not None:
+            self._by_container_id.setdefault(state.container_id, set()).add(state.msg_id)
+
+    def get(self, msg_id):
+        return self._by_msg_id.get(msg_id)
+
+    def pop(self, msg_id, default=None):
+        state = self._by_msg_id.pop(msg_id, None)
+        if state is None:
+            return default
+
+        if state.container_id is not None:
+            msg_ids = self._by_container_id.get(state.container_id)
+            if msg_ids is not None:
+                msg_ids.discard(msg_id)
+                if not msg_ids:
+                    del self._by_container_id[state.container_id]
+
+        return state
+
+    def pop_container(self, container_id):
+        """
+        Pops all the states which were sent inside the given container.
+        """
+        msg_ids = self._by_container_id.pop(container_id, ())
+        return [self._by_msg_id.pop(msg_id) for msg_id in msg_ids]
+
+    def values(self):
+        return self._by_msg_id.values()
+
+    def items(self):
+        return self._by_msg_id.items()
+
+    def clear(self):
+        self._by_msg_id.clear()
+        self._by_container_id.clear()
+
+
 class MTProtoSender:
     """
     MTProto Mobile Protocol sender
@@ -44,11 +98,15 @@ class MTProtoSender:
 
     A new authorization key will be generated on connection if no other
     key exists yet.
+
+    If `max_pending` or `max_pending_bytes` are given, `wait_for_capacity`
+    can be used to wait until less requests (or bytes) are in flight.
     """
     def __init__(self, auth_key, *, loggers,
                  retries=5, delay=1, auto_reconnect=True, connect_timeout=None,
                  auth_key_callback=None,
-                 updates_queue=None, auto_reconnect_callback=None):
+                 updates_queue=None, auto_reconnect_callback=None,
+                 batch_window=0, max_pending=None, max_pending_bytes=None):
         self._connection = None
         self._loggers = loggers
         self._log = loggers[__name__]
@@ -83,10 +141,19 @@ class MTProtoSender:
 
         # Outgoing messages are put in a queue and sent in a batch.
         # Note that here we're also storing their ``_RequestState``.
-        self._send_queue = MessagePacker(self._state, loggers=self._loggers)
+        self._send_queue = MessagePacker(
+            self._state, loggers=self._loggers, batch_window=batch_window)
 
         # Sent states are remembered until a response is received.
-        self._pending_state = {}
+        self._pending_state = _PendingStates()
+
+        # Requests given to `send` whose future is not done yet, and their size.
+        self._max_pending = max_pending
+        self._max_pending_bytes = max_pending_bytes
+        self._inflight_count = 0
+        self._inflight_bytes = 0
+        self._capacity = asyncio.Event()
+        self._capacity.set()
 
         # Responses must be acknowledged, and we can also batch these.
         self._pending_ack = set()
@@ -187,6 +254,7 @@ class MTProtoSender:
                 self._log.error('Request caused struct.error: %s: %s', e, request)
                 raise
 
+            self._track_inflight(state)
             self._send_queue.append(state)
             return state.future
         else:
@@ -203,9 +271,22 @@ class MTProtoSender:
                 states.append(state)
                 futures.append(state.future)
 
+            for state in states:
+                self._track_inflight(state)
+
             self._send_queue.extend(states)
             return futures
 
+    async def wait_for_capacity(self):
+        """
+        Waits until the amount of requests in flight (sent through `send`
+        but without a result yet) is below the configured maximum, so
+        that callers can't queue an unbounded amount of them.
+        """
+        while self._is_full():
+            self._capacity.clear()
+            await self._capacity.wait()
+
     @property
     def disconnected(self):
         """
@@ -217,8 +298,32 @@ class MTProtoSender:
         """
         return asyncio.shield(self._disconnected)
 
+    @property
+    def send_stats(self):
+        """
+        Statistics about the batches sent so far by this sender
+        (see `MessagePacker.stats`).
+        """
+        return self._send_queue.stats()
+
     # Private methods
 
+    def _is_full(self):
+        return ((self._max_pending and self._inflight_count >= self._max_pending)
+                or (self._max_pending_bytes and self._inflight_bytes >= self._max_pending_bytes))
+
+    def _track_inflight(self, state):
+        size = len(state.data)
+        self._inflight_count += 1
+        self._inflight_bytes += size
+        state.future.add_done_callback(functools.partial(self._untrack_inflight, size))
+
+    def _untrack_inflight(self, size, _future):
+        self._inflight_count -= 1
+        self._inflight_bytes -= size
+        if not self._is_full():
+            self._capacity.set()
+
     async def _connect(self):
         """
         Performs the actual connection, retrying, generating the
@@ -469,7 +574,7 @@ class MTProtoSender:
             self._log.debug('Encrypting %d message(s) in %d bytes for sending',
                             len(batch), len(data))
 
-            data = self._state.encrypt_message_data(data)
+            data = self._state.encrypt_message_buffer(data)
 
             # Whether sending succeeds or not, the popped requests are now
             # pending because they're removed from the queue. If a reconnect
@@ -479,11 +584,11 @@ class MTProtoSender:
             for state in batch:
                 if not isinstance(state, list):
                     if isinstance(state.request, TLRequest):
-                        self._pending_state[state.msg_id] = state
+                        self._pending_state.add(state)
                 else:
                     for s in state:
                         if isinstance(s.request, TLRequest):
-                            self._pending_state[s.msg_id] = s
+                            self._pending_state.add(s)
 
             try:
                 await self._connection.send(data)
@@ -580,13 +685,9 @@ class MTProtoSender:
         if state:
             return [state]
 
-        to_pop = []
-        for state in self._pending_state.values():
-            if state.container_id == msg_id:
-                to_pop.append(state.msg_id)
-
-        if to_pop:
-            return [self._pending_state.pop(x) for x in to_pop]
+        states = self._pending_state.pop_container(msg_id)
+        if states:
+            return states
 
         for ack in self._last_acks:
             if ack.msg_id == msg_id:
@@ -845,7 +946,7 @@ class MTProtoSender:
         for msg_id in ack.msg_ids:
             state = self._pending_state.get(msg_id)
             if state and isinstance(state.request, LogOutRequest):
-                del self._pending_state[msg_id]
+                self._pending_state.pop(msg_id)
                 if not state.future.cancelled():
                     state.future.set_result(True)
 
@@ -890,7 +991,7 @@ class MTProtoSender:
         else:
             return
 
-        del self._pending_state[msg_id]
+        self._pending_state.pop(msg_id)
         if not state.future.cancelled():
             state.future.set_result(message.obj)
 
@@ -905,7 +1006,7 @@ class MTProtoSender:
         self._log.debug('Handling destroy auth key %s', message.obj)
         for msg_id, state in list(self._pending_state.items()):
             if isinstance(state.request, DestroyAuthKeyRequest):
-                del self._pending_state[msg_id]
+                self._pending_state.pop(msg_id)
                 if not state.future.cancelled():
                     state.future.set_result(message.obj)
 
@@ -7,7 +7,7 @@ from collections import deque
 from ..crypto import AES
 from ..errors import SecurityError, InvalidBufferError
 from ..extensions import BinaryReader
-from ..tl.core import TLMessage
+from ..tl.core import TLMessage, MessageContainer
 from ..tl.tlobject import TLRequest
 from ..tl.functions import InvokeAfterMsgRequest
 from ..tl.core.gzippacked import GzipPacked
@@ -59,6 +59,12 @@ class MTProtoState:
     many methods that would be needed to make it convenient to use for the
     authentication process, at which point the `MTProtoPlainSender` is better.
     """
+    # Bytes reserved at the start of outgoing buffers (key_id, msg_key, salt and session_id)
+    ENCRYPTION_HEADER_SIZE = 40
+
+    # Bytes needed by the header of a message with a container inside
+    CONTAINER_HEADER_SIZE = 24
+
     def __init__(self, auth_key, loggers):
         self.auth_key = auth_key
         self._log = loggers[__name__]
@@ -109,7 +115,8 @@ class MTProtoState:
     def write_data_as_message(self, buffer, data, content_related,
                               *, after_id=None):
         """
-        Writes a message containing the given data into buffer.
+        Writes a message containing the given data into buffer,
+        which must be a ``bytearray``.
 
         Returns the message id.
         """
@@ -123,8 +130,23 @@ class MTProtoState:
             body = GzipPacked.gzip_if_smaller(content_related,
                 bytes(InvokeAfterMsgRequest(after_id, _OpaqueRequest(data))))
 
-        buffer.write(struct.pack('<qii', msg_id, seq_no, len(body)))
-        buffer.write(body)
+        buffer += struct.pack('<qii', msg_id, seq_no, len(body))
+        buffer += body
+        return msg_id
+
+    def write_container_header(self, buffer, offset, count):
+        """
+        Writes the header of a message with a container of `count` messages
+        into the `CONTAINER_HEADER_SIZE` bytes of `buffer` at `offset`. The
+        messages must be written right after it, until the end of `buffer`.
+
+        Returns the message id of the container.
+        """
+        msg_id = self._get_new_msg_id()
+        seq_no = self._get_seq_no(False)
+        length = len(buffer) - offset - 16
+        struct.pack_into('<qiiIi', buffer, offset, msg_id, seq_no, length,
+                         MessageContainer.CONSTRUCTOR_ID, count)
         return msg_id
 
     def encrypt_message_data(self, data):
@@ -148,6 +170,27 @@ class MTProtoState:
         return (key_id + msg_key +
                 AES.encrypt_ige(data + padding, aes_key, aes_iv))
 
+    def encrypt_message_buffer(self, buffer):
+        """
+        Like `encrypt_message_data`, but encrypts the data in-place.
+
+        The `buffer` must be a ``bytearray`` whose first `ENCRYPTION_HEADER_SIZE`
+        bytes are reserved to write the header. The padding is appended to
+        it, and the same `buffer` is returned, ready to be sent.
+        """
+        struct.pack_into('<qq', buffer, 24, self.salt, self.id)
+        buffer += os.urandom(-(len(buffer) - 24 + 12) % 16 + 12)
+
+        with memoryview(buffer) as view, view[24:] as data:
+            msg_key_large = sha256(self.auth_key.key[88:88 + 32])
+            msg_key_large.update(data)
+            msg_key = msg_key_large.digest()[8:24]
+            aes_key, aes_iv = self._calc_key(self.auth_key.key, msg_key, True)
+            AES.encrypt_ige_inplace(data, aes_key, aes_iv)
+
+        struct.pack_into('<Q16s', buffer, 0, self.auth_key.key_id, msg_key)
+        return buffer
+
     def decrypt_message_data(self, body):
         """
         Inverse of `encrypt_message_data` for incoming server messages.
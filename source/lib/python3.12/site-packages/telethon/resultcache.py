@@ -0,0 +1,156 @@
+"""
+Caching of the results of requests which take a ``hash``, so that
+requesting them again only downloads them if they have changed.
+"""
+from .extensions import BinaryReader
+from .tl import functions
+
+_MASK = (1 << 64) - 1
+
+
+def _vector_hash(ids):
+    # https://core.telegram.org/api/offsets#hash-generation
+    result = 0
+    for i in ids:
+        result ^= result >> 21
+        result ^= (result << 35) & _MASK
+        result ^= result >> 4
+        result = (result + i) & _MASK
+    return result - (1 << 64) if result >= (1 << 63) else result
+
+
+def _result_hash(result):
+    return result.hash
+
+
+# {request constructor: function(result) -> hash to send next time}
+_HASHES = dict.fromkeys((
+    cls.CONSTRUCTOR_ID for cls in (
+        functions.account.GetChannelDefaultEmojiStatusesRequest,
+        functions.account.GetChannelRestrictedStatusEmojisRequest,
+        functions.account.GetChatThemesRequest,
+        functions.account.GetCollectibleEmojiStatusesRequest,
+        functions.account.GetDefaultBackgroundEmojisRequest,
+        functions.account.GetDefaultEmojiStatusesRequest,
+        functions.account.GetDefaultGroupPhotoEmojisRequest,
+        functions.account.GetDefaultProfilePhotoEmojisRequest,
+        functions.account.GetRecentEmojiStatusesRequest,
+        functions.account.GetSavedRingtonesRequest,
+        functions.account.GetThemesRequest,
+        functions.account.GetUniqueGiftChatThemesRequest,
+        functions.account.GetWallPapersRequest,
+        functions.help.GetAppConfigRequest,
+        functions.help.GetCountriesListRequest,
+        functions.help.GetPassportConfigRequest,
+        functions.help.GetPeerColorsRequest,
+        functions.help.GetPeerProfileColorsRequest,
+        functions.help.GetTimezonesListRequest,
+        functions.messages.GetAllStickersRequest,
+        functions.messages.GetAttachMenuBotsRequest,
+        functions.messages.GetAvailableEffectsRequest,
+        functions.messages.GetAvailableReactionsRequest,
+        functions.messages.GetDefaultTagReactionsRequest,
+        functions.messages.GetEmojiGroupsRequest,
+        functions.messages.GetEmojiProfilePhotoGroupsRequest,
+        functions.messages.GetEmojiStatusGroupsRequest,
+        functions.messages.GetEmojiStickerGroupsRequest,
+        functions.messages.GetEmojiStickersRequest,
+        functions.messages.GetFavedStickersRequest,
+        functions.messages.GetFeaturedEmojiStickersRequest,
+        functions.messages.GetFeaturedStickersRequest,
+        functions.messages.GetMaskStickersRequest,
+        functions.messages.GetOldFeaturedStickersRequest,
+        functions.messages.GetRecentReactionsRequest,
+        functions.messages.GetRecentStickersRequest,
+        functions.messages.GetSavedGifsRequest,
+        functions.messages.GetSavedReactionTagsRequest,
+        functions.messages.GetStickersRequest,
+        functions.messages.GetTopReactionsRequest,
+        functions.messages.SearchCustomEmojiRequest,
+        functions.messages.SearchEmojiStickerSetsRequest,
+        functions.messages.SearchStickerSetsRequest,
+        functions.messages.SearchStickersRequest,
+        functions.payments.GetStarGiftsRequest,
+        functions.stories.GetAlbumsRequest,
+    )
+), _result_hash)
+
+_HASHES[functions.contacts.GetContactsRequest.CONSTRUCTOR_ID] = \
+    lambda r: _vector_hash([r.saved_count, *sorted(c.user_id for c in r.contacts)])
+_HASHES[functions.messages.GetStickerSetRequest.CONSTRUCTOR_ID] = \
+    lambda r: r.set.hash
+
+
+def get_key(request):
+    """
+    Returns the key under which the result of ``request`` is cached,
+    or `None` if its result can't be cached. Requests with a ``hash``
+    other than zero are not cached, since the caller is doing it.
+    """
+    if request.CONSTRUCTOR_ID in _HASHES and not request.hash:
+        return bytes(request)
+
+
+def get_hash(request, result):
+    """
+    Returns the ``hash`` with which ``request`` will only return
+    ``result`` again if it has changed, or `None` if it's not known.
+    """
+    try:
+        return _HASHES[request.CONSTRUCTOR_ID](result)
+    except (KeyError, AttributeError):
+        return None
+
+
+def is_not_modified(result):
+    """
+    Returns `True` if ``result`` means the cached one has not changed.
+    """
+    return type(result).__name__.endswith('NotModified')
+
+
+class ResultCache:
+    """
+    Remembers the last result of each request (with all its arguments)
+    which takes a ``hash``, such as :tl:`GetAllStickersRequest` or
+    :tl:`GetContactsRequest`, and sends the ``hash`` of that result the
+    next time. If Telegram replies that it has not been modified, the
+    cached result is returned instead, so only a few bytes travel.
+
+    This instance keeps the results serialized in memory, so that every
+    hit returns a new copy which callers are free to modify. Subclasses
+    may override `get` and `set` to keep them elsewhere.
+    """
+    def __init__(self):
+        self._results = {}
+
+    def get(self, key):
+        """
+        Returns a copy of the result cached under ``key``, or `None`.
+        """
+        data = self._results.get(key)
+        if data is not None:
+            with BinaryReader(data) as reader:
+                return reader.tgread_object()
+
+    def set(self, key, result):
+        """
+        Caches ``result`` under ``key``, replacing the previous one.
+        """
+        self._results[key] = bytes(result)
+
+
+class SessionResultCache(ResultCache):
+    """
+    Keeps the results in the ``session``, which may persist them
+    (the `SQLiteSession` does, so they survive restarts).
+    """
+    def __init__(self, session):
+        super().__init__()
+        self.session = session
+
+    def get(self, key):
+        return self.session.get_cached_result(key)
+
+    def set(self, key, result):
+        self.session.set_cached_result(key, result)
@@ -78,6 +78,54 @@ class Session(ABC):
         """
         raise NotImplementedError
 
+    def get_exported_auth_key(self, dc_id):
+        """
+        Returns the ``AuthKey`` which was previously authorized in the
+        given `dc_id` by exporting the authorization of the home data
+        center, or `None` if no such key is known.
+
+        Sessions which don't persist exported keys can leave this as-is.
+        """
+        return None
+
+    def set_exported_auth_key(self, dc_id, auth_key):
+        """
+        Sets the ``AuthKey`` which was authorized in the given `dc_id`.
+        Setting it to `None` should forget the key for that data center.
+
+        Sessions which persist exported keys should forget all of them
+        when `auth_key` is reset or changed, since they belong to the
+        account which was logged in with the previous key.
+        """
+
+    def get_config(self):
+        """
+        Returns the last ``Config`` saved with `set_config`, or `None`.
+        The library checks its ``expires`` date before using it.
+        """
+        return None
+
+    def set_config(self, config):
+        """
+        Sets the ``Config`` (with the ``dc_options``) the server sent.
+        """
+
+    def get_cached_result(self, key):
+        """
+        Returns the result saved with `set_cached_result` under the given
+        ``key`` (which is `bytes`), or `None`. A new instance should be
+        returned every time, since it may be modified by whoever gets it.
+
+        Sessions which don't persist results can leave this as-is.
+        """
+        return None
+
+    def set_cached_result(self, key, result):
+        """
+        Sets the result of a request which takes a ``hash``, so that it's
+        only fetched again if it changed. Only one per ``key`` is needed.
+        """
+
     @abstractmethod
     def get_update_state(self, entity_id):
         """
@@ -157,7 +205,7 @@ class Session(ABC):
         doesn't need to be re-uploaded in case the file is used again.
 
         The ``instance`` will be either an ``InputPhoto`` or ``InputDocument``,
-        both with an ``.id`` and ``.access_hash`` attributes.
+        both with an ``.id``, ``.access_hash`` and ``.file_reference`` attributes.
         """
         raise NotImplementedError
 
@@ -166,7 +214,8 @@ class Session(ABC):
         """
         Returns an instance of ``cls`` if the ``md5_digest`` and ``file_size``
         match an existing saved record. The class will either be an
-        ``InputPhoto`` or ``InputDocument``, both with two parameters
-        ``id`` and ``access_hash`` in that order.
+        ``InputPhoto`` or ``InputDocument``, both with three parameters
+        ``id``, ``access_hash`` and ``file_reference`` in that order (the
+        last one may be omitted, but the file won't be usable without it).
         """
         raise NotImplementedError
@@ -2,6 +2,7 @@ from enum import Enum
 
 from .abstract import Session
 from .. import utils
+from ..extensions import BinaryReader
 from ..tl import TLObject
 from ..tl.types import (
     PeerUser, PeerChat, PeerChannel,
@@ -33,6 +34,9 @@ class MemorySession(Session):
         self._port = None
         self._auth_key = None
         self._takeout_id = None
+        self._exported_auth_keys = {}
+        self._config = None
+        self._cached_results = {}
 
         self._files = {}
         self._entities = set()
@@ -61,6 +65,9 @@ class MemorySession(Session):
 
     @auth_key.setter
     def auth_key(self, value):
+        # The exported keys were authorized by the previous one
+        if value != self._auth_key:
+            self._exported_auth_keys.clear()
         self._auth_key = value
 
     @property
@@ -71,6 +78,31 @@ class MemorySession(Session):
     def takeout_id(self, value):
         self._takeout_id = value
 
+    def get_exported_auth_key(self, dc_id):
+        return self._exported_auth_keys.get(dc_id)
+
+    def set_exported_auth_key(self, dc_id, auth_key):
+        if auth_key:
+            self._exported_auth_keys[dc_id] = auth_key
+        else:
+            self._exported_auth_keys.pop(dc_id, None)
+
+    def get_config(self):
+        return self._config
+
+    def set_config(self, config):
+        self._config = config
+
+    def get_cached_result(self, key):
+        # Stored serialized so that modifying the returned copy is harmless
+        data = self._cached_results.get(key)
+        if data is not None:
+            with BinaryReader(data) as reader:
+                return reader.tgread_object()
+
+    def set_cached_result(self, key, result):
+        self._cached_results[key] = bytes(result)
+
     def get_update_state(self, entity_id):
         return self._update_states.get(entity_id, None)
 
@@ -240,7 +272,7 @@ class MemorySession(Session):
         if not isinstance(instance, (InputDocument, InputPhoto)):
             raise TypeError('Cannot cache %s instance' % type(instance))
         key = (md5_digest, file_size, _SentFileType.from_type(type(instance)))
-        value = (instance.id, instance.access_hash)
+        value = (instance.id, instance.access_hash, instance.file_reference)
         self._files[key] = value
 
     def get_file(self, md5_digest, file_size, cls):
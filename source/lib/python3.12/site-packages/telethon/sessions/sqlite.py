@@ -5,6 +5,7 @@ import time
 from ..tl import types
 from .memory import MemorySession, _SentFileType
 from .. import utils
+from ..extensions import BinaryReader
 from ..crypto import AuthKey
 from ..tl.types import (
     InputPhoto, InputDocument, PeerUser, PeerChat, PeerChannel
@@ -18,7 +19,7 @@ except ImportError as e:
     sqlite3_err = type(e)
 
 EXTENSION = '.session'
-CURRENT_VERSION = 7  # database version
+CURRENT_VERSION = 10  # database version
 
 
 class SQLiteSession(MemorySession):
@@ -95,6 +96,7 @@ class SQLiteSession(MemorySession):
                     type integer,
                     id integer,
                     hash integer,
+                    file_reference blob,
                     primary key(md5_digest, file_size, type)
                 )"""
                 ,
@@ -105,6 +107,20 @@ class SQLiteSession(MemorySession):
                     date integer,
                     seq integer
                 )"""
+                ,
+                """exported_auth (
+                    dc_id integer primary key,
+                    auth_key blob
+                )"""
+                ,
+                """config (
+                    data blob
+                )"""
+                ,
+                """cached_results (
+                    key blob primary key,
+                    data blob
+                )"""
             )
             c.execute("insert into version values (?)", (CURRENT_VERSION,))
             self._update_session_table()
@@ -153,6 +169,25 @@ class SQLiteSession(MemorySession):
         if old == 6:
             old += 1
             c.execute("alter table entities add column date integer")
+        if old == 7:
+            old += 1
+            self._create_table(c, """exported_auth (
+                dc_id integer primary key,
+                auth_key blob
+            )""", """config (
+                data blob
+            )""")
+        if old == 8:
+            old += 1
+            self._create_table(c, """cached_results (
+                key blob primary key,
+                data blob
+            )""")
+        if old == 9:
+            old += 1
+            # Files cached without their reference can't be sent anyway
+            c.execute('delete from sent_files')
+            c.execute('alter table sent_files add column file_reference blob')
 
         c.close()
 
@@ -176,6 +211,9 @@ class SQLiteSession(MemorySession):
 
     @MemorySession.auth_key.setter
     def auth_key(self, value):
+        # The exported keys were authorized by the previous one
+        if value != self._auth_key:
+            self._execute('delete from exported_auth')
         self._auth_key = value
         self._update_session_table()
 
@@ -201,6 +239,51 @@ class SQLiteSession(MemorySession):
         ))
         c.close()
 
+    def get_exported_auth_key(self, dc_id):
+        row = self._execute(
+            'select auth_key from exported_auth where dc_id = ?', dc_id)
+        if row and row[0]:
+            return AuthKey(data=row[0])
+
+    def set_exported_auth_key(self, dc_id, auth_key):
+        if auth_key:
+            self._execute('insert or replace into exported_auth values (?,?)',
+                          dc_id, auth_key.key)
+        else:
+            self._execute('delete from exported_auth where dc_id = ?', dc_id)
+
+    def get_config(self):
+        row = self._execute('select data from config')
+        if row and row[0]:
+            try:
+                with BinaryReader(row[0]) as reader:
+                    return reader.tgread_object()
+            except Exception:
+                # Saved with a different layer; it will be fetched again
+                return None
+
+    def set_config(self, config):
+        c = self._cursor()
+        try:
+            c.execute('delete from config')
+            c.execute('insert into config values (?)', (bytes(config),))
+        finally:
+            c.close()
+
+    def get_cached_result(self, key):
+        row = self._execute('select data from cached_results where key = ?', key)
+        if row and row[0]:
+            try:
+                with BinaryReader(row[0]) as reader:
+                    return reader.tgread_object()
+            except Exception:
+                # Saved with a different layer; it will be fetched again
+                return None
+
+    def set_cached_result(self, key, result):
+        self._execute('insert or replace into cached_results values (?,?)',
+                      key, bytes(result))
+
     def get_update_state(self, entity_id):
         row = self._execute('select pts, qts, date, seq from update_state '
                             'where id = ?', entity_id)
@@ -348,21 +431,21 @@ class SQLiteSession(MemorySession):
 
     def get_file(self, md5_digest, file_size, cls):
         row = self._execute(
-            'select id, hash from sent_files '
+            'select id, hash, file_reference from sent_files '
             'where md5_digest = ? and file_size = ? and type = ?',
             md5_digest, file_size, _SentFileType.from_type(cls).value
         )
         if row:
-            # Both allowed classes have (id, access_hash) as parameters
-            return cls(row[0], row[1])
+            # Both allowed classes have (id, access_hash, file_reference) as parameters
+            return cls(row[0], row[1], row[2] or b'')
 
     def cache_file(self, md5_digest, file_size, instance):
         if not isinstance(instance, (InputDocument, InputPhoto)):
             raise TypeError('Cannot cache %s instance' % type(instance))
 
         self._execute(
-            'insert or replace into sent_files values (?,?,?,?,?)',
+            'insert or replace into sent_files values (?,?,?,?,?,?)',
             md5_digest, file_size,
             _SentFileType.from_type(type(instance)).value,
-            instance.id, instance.access_hash
+            instance.id, instance.access_hash, instance.file_reference
         )
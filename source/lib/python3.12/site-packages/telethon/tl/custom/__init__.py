@@ -12,3 +12,4 @@ from .inlineresults import InlineResults
 from .conversation import Conversation
 from .qrlogin import QRLogin
 from .participantpermissions import ParticipantPermissions
+from .messagecolumns import MessageColumns
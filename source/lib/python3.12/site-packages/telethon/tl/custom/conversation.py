@@ -336,12 +336,15 @@ class Conversation(ChatGetter):
 
         future = self._client.loop.create_future()
         self._custom[counter] = (event, future)
+        self._client._event_conversations.add(self)
         try:
             return await self._get_result(future, start_time, timeout, self._custom, counter)
         finally:
             # Need to remove it from the dict if it times out, else we may
             # try and fail to set the result later (#1618).
             self._custom.pop(counter, None)
+            if not self._custom:
+                self._client._event_conversations.discard(self)
 
     async def _check_custom(self, built):
         for key, (ev, fut) in list(self._custom.items()):
@@ -443,7 +446,7 @@ class Conversation(ChatGetter):
         #       dispatch another update before, and in that case a
         #       response could be set twice. So responses must be
         #       cleared when their futures are set to a result.
-        return asyncio.wait_for(
+        return self._client._scheduler.wait_for(
             future,
             timeout=None if due == float('inf') else due - time.time()
         )
@@ -522,6 +525,7 @@ class Conversation(ChatGetter):
         conv_set.discard(self)
         if not conv_set:
             del self._client._conversations[chat_id]
+        self._client._event_conversations.discard(self)
 
         self._cancel_all()
 
@@ -9,6 +9,26 @@ from .. import TLObject, types, functions, alltlobjects
 from ... import utils, errors
 
 
+class _LazyAttribute:
+    """
+    Attribute of `Message` which `Message._finish_init` leaves to be
+    resolved (along with the rest) the first time one is accessed.
+
+    Because this only defines ``__get__``, it's not used at all as long
+    as the instance has its own value for the attribute. Messages which
+    were never initialized this way simply default to `None`.
+    """
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        instance._resolve_entities()
+        return instance.__dict__.get(self._name)
+
+
 # TODO Figure out a way to have the code generator error on missing fields
 # Maybe parsing the init function alone if that's possible.
 class Message(ChatGetter, SenderGetter, TLObject):
@@ -281,10 +301,6 @@ class Message(ChatGetter, SenderGetter, TLObject):
         self._buttons = None
         self._buttons_flat = None
         self._buttons_count = None
-        self._via_bot = None
-        self._via_input_bot = None
-        self._action_entities = None
-        self._linked_chat = None
 
         sender_id = None
         if from_id is not None:
@@ -301,70 +317,110 @@ class Message(ChatGetter, SenderGetter, TLObject):
         ChatGetter.__init__(self, peer_id, broadcast=post)
         SenderGetter.__init__(self, sender_id)
 
-        self._forward = None
-        self._reply_to_chat = None
-        self._reply_to_sender = None
 
     def _finish_init(self, client, entities, input_chat):
         """
         Finishes the initialization of this message by setting
         the client that sent the message and making use of the
         known entities.
+
+        The entities are only looked up the first time they're
+        needed (see `_LazyAttribute`), since most are never used
+        when iterating over lots of messages.
         """
         self._client = client
 
         # Make messages sent to ourselves outgoing unless they're forwarded.
         # This makes it consistent with official client's appearance.
-        if self.peer_id == types.PeerUser(client._self_id) and not self.fwd_from:
+        if isinstance(self.peer_id, types.PeerUser) \
+                and self.peer_id.user_id == client._self_id \
+                and not self.fwd_from:
             self.out = True
 
-        cache = client._mb_entity_cache
+        # The same map is shared by all the messages from the same batch
+        self._lazy_entities = entities
+        self._lazy_input_chat = input_chat
+        for name in _LAZY_ATTRIBUTES:
+            self.__dict__.pop(name, None)
 
-        self._sender, self._input_sender = utils._get_entity_pair(
+    def _resolve_entities(self):
+        """
+        Sets the attributes left pending by `_finish_init`, unless
+        they were explicitly assigned after it was called.
+        """
+        entities = self.__dict__.pop('_lazy_entities', None)
+        if entities is None:
+            return
+
+        setdefault = self.__dict__.setdefault
+        cache = self._client._mb_entity_cache
+
+        sender, input_sender = utils._get_entity_pair(
             self.sender_id, entities, cache)
+        setdefault('_sender', sender)
+        setdefault('_input_sender', input_sender)
 
-        self._chat, self._input_chat = utils._get_entity_pair(
+        chat, input_chat = utils._get_entity_pair(
             self.chat_id, entities, cache)
+        setdefault('_chat', chat)
+        setdefault('_input_chat', self.__dict__.pop('_lazy_input_chat', None) or input_chat)
 
-        if input_chat:  # This has priority
-            self._input_chat = input_chat
-
+        via_bot = via_input_bot = None
         if self.via_bot_id:
-            self._via_bot, self._via_input_bot = utils._get_entity_pair(
+            via_bot, via_input_bot = utils._get_entity_pair(
                 self.via_bot_id, entities, cache)
+        setdefault('_via_bot', via_bot)
+        setdefault('_via_input_bot', via_input_bot)
 
-        if self.fwd_from:
-            self._forward = Forward(self._client, self.fwd_from, entities)
+        setdefault('_forward', Forward(self._client, self.fwd_from, entities)
+                   if self.fwd_from else None)
 
+        action_entities = None
         if self.action:
             if isinstance(self.action, (types.MessageActionChatAddUser,
                                         types.MessageActionChatCreate)):
-                self._action_entities = [entities.get(i)
-                                         for i in self.action.users]
+                action_entities = [entities.get(i)
+                                   for i in self.action.users]
             elif isinstance(self.action, types.MessageActionChatDeleteUser):
-                self._action_entities = [entities.get(self.action.user_id)]
+                action_entities = [entities.get(self.action.user_id)]
             elif isinstance(self.action, types.MessageActionChatJoinedByLink):
-                self._action_entities = [entities.get(self.action.inviter_id)]
+                action_entities = [entities.get(self.action.inviter_id)]
             elif isinstance(self.action, types.MessageActionChatMigrateTo):
-                self._action_entities = [entities.get(utils.get_peer_id(
+                action_entities = [entities.get(utils.get_peer_id(
                     types.PeerChannel(self.action.channel_id)))]
             elif isinstance(
                     self.action, types.MessageActionChannelMigrateFrom):
-                self._action_entities = [entities.get(utils.get_peer_id(
+                action_entities = [entities.get(utils.get_peer_id(
                     types.PeerChat(self.action.chat_id)))]
+        setdefault('_action_entities', action_entities)
 
+        linked_chat = None
         if self.replies and self.replies.channel_id:
-            self._linked_chat = entities.get(utils.get_peer_id(
+            linked_chat = entities.get(utils.get_peer_id(
                     types.PeerChannel(self.replies.channel_id)))
-        
+        setdefault('_linked_chat', linked_chat)
+
+        reply_to_chat = reply_to_sender = None
         if isinstance(self.reply_to, types.MessageReplyHeader):
             if self.reply_to.reply_to_peer_id:
-                self._reply_to_chat = entities.get(utils.get_peer_id(self.reply_to.reply_to_peer_id))
+                reply_to_chat = entities.get(utils.get_peer_id(self.reply_to.reply_to_peer_id))
             if self.reply_to.reply_from:
                 if self.reply_to.reply_from.from_id:
-                    self._reply_to_sender = entities.get(utils.get_peer_id(self.reply_to.reply_from.from_id))
-
-
+                    reply_to_sender = entities.get(utils.get_peer_id(self.reply_to.reply_from.from_id))
+        setdefault('_reply_to_chat', reply_to_chat)
+        setdefault('_reply_to_sender', reply_to_sender)
+
+    _sender = _LazyAttribute()
+    _input_sender = _LazyAttribute()
+    _chat = _LazyAttribute()
+    _input_chat = _LazyAttribute()
+    _via_bot = _LazyAttribute()
+    _via_input_bot = _LazyAttribute()
+    _forward = _LazyAttribute()
+    _action_entities = _LazyAttribute()
+    _linked_chat = _LazyAttribute()
+    _reply_to_chat = _LazyAttribute()
+    _reply_to_sender = _LazyAttribute()
 
     # endregion Initialization
 
@@ -1236,3 +1292,8 @@ class Message(ChatGetter, SenderGetter, TLObject):
                     return None
 
     # endregion Private Methods
+
+
+# Names of the attributes which `Message._finish_init` leaves pending
+_LAZY_ATTRIBUTES = tuple(
+    k for k, v in vars(Message).items() if isinstance(v, _LazyAttribute))
@@ -0,0 +1,139 @@
+import array
+
+# Name and array typecode of each fixed-width column
+_COLUMNS = (
+    ('id', 'i'),
+    ('date', 'q'),
+    ('sender_id', 'q'),
+    ('views', 'i'),
+    ('forwards', 'i'),
+    ('reply_to_msg_id', 'i'),
+)
+
+# NumPy type of each column (``date`` is converted to ``datetime64``)
+_DTYPES = {'i': 'int32', 'q': 'int64'}
+
+
+class MessageColumns:
+    """
+    Columnar storage for the metadata of many messages, as returned by
+    `client.get_message_columns()
+    <telethon.client.messages.MessageMethods.get_message_columns>`.
+
+    Instead of one `Message <telethon.tl.custom.message.Message>` per
+    message, every column is a growing ``array.array`` of fixed-width
+    integers, and the text of all the messages is kept in one UTF-8
+    buffer. This makes it cheap to hold millions of messages and to
+    hand them to NumPy (which is only needed for `to_numpy` and
+    `to_records`).
+
+    Members:
+        id (``array.array``):
+            The ID of each message.
+
+        date (``array.array``):
+            The date of each message, as seconds since the epoch.
+
+        sender_id (``array.array``):
+            The marked ID of the sender, or ``0`` if there is none.
+
+        views (``array.array``):
+            The view count of each message, or ``0`` if it's unknown.
+
+        forwards (``array.array``):
+            The forward count of each message, or ``0`` if it's unknown.
+
+        reply_to_msg_id (``array.array``):
+            The ID of the message being replied to, or ``0`` if none.
+
+        text_offsets (``array.array``):
+            Where the text of each message starts (and the previous ends)
+            in `text`. Its length is always one more than the amount of
+            messages, so the text of the message ``i`` is found at
+            ``text[text_offsets[i]:text_offsets[i + 1]]``.
+
+        text (``bytearray``):
+            The UTF-8 encoded text of all the messages, one after another.
+    """
+    def __init__(self):
+        for name, typecode in _COLUMNS:
+            setattr(self, name, array.array(typecode))
+        self.text_offsets = array.array('q', (0,))
+        self.text = bytearray()
+
+    def __len__(self):
+        return len(self.id)
+
+    def append(self, message):
+        """
+        Adds the given :tl:`Message` or :tl:`MessageService` to the columns.
+        """
+        self.extend((message,))
+
+    def extend(self, messages):
+        """
+        Adds all the given messages to the columns.
+        """
+        # Filling a column at a time is faster than a message at a time
+        messages = list(messages)
+        self.id.extend([m.id for m in messages])
+        self.date.extend([int(m.date.timestamp()) if m.date else 0 for m in messages])
+        self.sender_id.extend([m.sender_id or 0 for m in messages])
+        self.views.extend([getattr(m, 'views', None) or 0 for m in messages])
+        self.forwards.extend([getattr(m, 'forwards', None) or 0 for m in messages])
+        self.reply_to_msg_id.extend([
+            getattr(m.reply_to, 'reply_to_msg_id', None) or 0 for m in messages])
+
+        text = self.text
+        text_offsets = self.text_offsets
+        for m in messages:
+            if m.message:
+                text += m.message.encode('utf-8')
+            text_offsets.append(len(text))
+
+    def get_text(self, index):
+        """
+        Returns the text of the message at the given index.
+        """
+        return self.text[self.text_offsets[index]:self.text_offsets[index + 1]].decode('utf-8')
+
+    def _fixed_width_numpy(self):
+        import numpy
+
+        # The arrays are read through their buffer, so that the data is
+        # only copied once (views would stop the columns from growing).
+        result = {
+            name: numpy.frombuffer(getattr(self, name), dtype=_DTYPES[typecode]).copy()
+            for name, typecode in _COLUMNS
+        }
+        result['date'] = result['date'].view('datetime64[s]')
+        return result
+
+    def to_numpy(self):
+        """
+        Returns a `dict` with a NumPy array for each column (with ``date``
+        as ``datetime64[s]``), plus ``text_offsets`` and ``text``, where
+        the latter is a ``uint8`` array. The data is copied, so adding
+        more messages later won't change the returned arrays.
+
+        Requires NumPy to be installed.
+        """
+        import numpy
+
+        result = self._fixed_width_numpy()
+        result['text_offsets'] = numpy.frombuffer(self.text_offsets, dtype='int64').copy()
+        result['text'] = numpy.frombuffer(self.text, dtype='uint8').copy()
+        return result
+
+    def to_records(self):
+        """
+        Returns a NumPy record array with one record per message and
+        a field for each of the fixed-width columns. The text is not
+        included, since it doesn't have a fixed width.
+
+        Requires NumPy to be installed.
+        """
+        import numpy
+
+        arrays = self._fixed_width_numpy()
+        return numpy.rec.fromarrays(list(arrays.values()), names=list(arrays))
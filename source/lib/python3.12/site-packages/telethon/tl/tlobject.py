@@ -31,6 +31,28 @@ def _json_default(value):
         return repr(value)
 
 
+# Field names of each `TLObject` class, computed on first comparison
+_FIELDS = {}
+
+
+def _fields_of(cls):
+    # The fields are the parameters of ``__init__`` in the class defining
+    # ``to_dict``, which is the generated (or core) class. Subclasses like
+    # the custom ``Message`` may have their own ``__init__`` but the same
+    # fields. If the fields can't be known, ``None`` is returned instead.
+    for base in cls.__mro__:
+        if 'to_dict' in base.__dict__:
+            break
+    if base is TLObject:
+        return None
+    if '__init__' not in base.__dict__:
+        return ()  # constructors without parameters don't define one
+    code = getattr(base.__init__, '__code__', None)
+    if code is None:
+        return None
+    return code.co_varnames[1:code.co_argcount + code.co_kwonlyargcount]
+
+
 class TLObject:
     CONSTRUCTOR_ID = None
     SUBCLASS_OF_ID = None
@@ -158,10 +180,30 @@ class TLObject:
         raise TypeError('Cannot interpret "{}" as a date.'.format(dt))
 
     def __eq__(self, o):
-        return isinstance(o, type(self)) and self.to_dict() == o.to_dict()
+        if self is o:
+            return True
+        if not isinstance(o, type(self)):
+            return False
+
+        try:
+            fields = _FIELDS[type(self)]
+        except KeyError:
+            fields = _FIELDS[type(self)] = _fields_of(type(self))
+
+        if fields is None:
+            return self.to_dict() == o.to_dict()
+
+        # Compare field by field (like ``dict`` would, identity first)
+        # instead of building the nested ``to_dict()`` of both objects.
+        for field in fields:
+            a = getattr(self, field)
+            b = getattr(o, field)
+            if a is not b and a != b:
+                return False
+        return True
 
     def __ne__(self, o):
-        return not isinstance(o, type(self)) or self.to_dict() != o.to_dict()
+        return not isinstance(o, type(self)) or not self.__eq__(o)
 
     def __str__(self):
         return TLObject.pretty_format(self)
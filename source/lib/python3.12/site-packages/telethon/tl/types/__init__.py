@@ -16184,6 +16184,12 @@ class InputPeerChannel(TLObject):
             'access_hash': self.access_hash
         }
 
+    def __eq__(self, o):
+        return isinstance(o, type(self)) and self.channel_id == o.channel_id and self.access_hash == o.access_hash
+
+    def __hash__(self):
+        return hash((InputPeerChannel.CONSTRUCTOR_ID, self.channel_id, self.access_hash))
+
     def _bytes(self):
         return b''.join((
             b"\xfc\xbb\xbc'",
@@ -16218,6 +16224,12 @@ class InputPeerChannelFromMessage(TLObject):
             'channel_id': self.channel_id
         }
 
+    def __eq__(self, o):
+        return isinstance(o, type(self)) and self.peer == o.peer and self.msg_id == o.msg_id and self.channel_id == o.channel_id
+
+    def __hash__(self):
+        return hash((InputPeerChannelFromMessage.CONSTRUCTOR_ID, self.peer, self.msg_id, self.channel_id))
+
     def _bytes(self):
         return b''.join((
             b'@\x08*\xbd',
@@ -16250,6 +16262,12 @@ class InputPeerChat(TLObject):
             'chat_id': self.chat_id
         }
 
+    def __eq__(self, o):
+        return isinstance(o, type(self)) and self.chat_id == o.chat_id
+
+    def __hash__(self):
+        return hash((InputPeerChat.CONSTRUCTOR_ID, self.chat_id))
+
     def _bytes(self):
         return b''.join((
             b'\xb9\\\xa95',
@@ -16271,6 +16289,12 @@ class InputPeerEmpty(TLObject):
             '_': 'InputPeerEmpty'
         }
 
+    def __eq__(self, o):
+        return isinstance(o, type(self))
+
+    def __hash__(self):
+        return hash(InputPeerEmpty.CONSTRUCTOR_ID)
+
     def _bytes(self):
         return b''.join((
             b'\xea\x18;\x7f',
@@ -16404,6 +16428,12 @@ class InputPeerSelf(TLObject):
             '_': 'InputPeerSelf'
         }
 
+    def __eq__(self, o):
+        return isinstance(o, type(self))
+
+    def __hash__(self):
+        return hash(InputPeerSelf.CONSTRUCTOR_ID)
+
     def _bytes(self):
         return b''.join((
             b'\xc9~\xa0}',
@@ -16432,6 +16462,12 @@ class InputPeerUser(TLObject):
             'access_hash': self.access_hash
         }
 
+    def __eq__(self, o):
+        return isinstance(o, type(self)) and self.user_id == o.user_id and self.access_hash == o.access_hash
+
+    def __hash__(self):
+        return hash((InputPeerUser.CONSTRUCTOR_ID, self.user_id, self.access_hash))
+
     def _bytes(self):
         return b''.join((
             b'L\xa5\xe8\xdd',
@@ -16466,6 +16502,12 @@ class InputPeerUserFromMessage(TLObject):
             'user_id': self.user_id
         }
 
+    def __eq__(self, o):
+        return isinstance(o, type(self)) and self.peer == o.peer and self.msg_id == o.msg_id and self.user_id == o.user_id
+
+    def __hash__(self):
+        return hash((InputPeerUserFromMessage.CONSTRUCTOR_ID, self.peer, self.msg_id, self.user_id))
+
     def _bytes(self):
         return b''.join((
             b'\x1c\n{\xa8',
@@ -28513,6 +28555,12 @@ class PeerChannel(TLObject):
             'channel_id': self.channel_id
         }
 
+    def __eq__(self, o):
+        return isinstance(o, type(self)) and self.channel_id == o.channel_id
+
+    def __hash__(self):
+        return hash((PeerChannel.CONSTRUCTOR_ID, self.channel_id))
+
     def _bytes(self):
         return b''.join((
             b'\x1e7\xa5\xa2',
@@ -28541,6 +28589,12 @@ class PeerChat(TLObject):
             'chat_id': self.chat_id
         }
 
+    def __eq__(self, o):
+        return isinstance(o, type(self)) and self.chat_id == o.chat_id
+
+    def __hash__(self):
+        return hash((PeerChat.CONSTRUCTOR_ID, self.chat_id))
+
     def _bytes(self):
         return b''.join((
             b'\x9a\x01\xc66',
@@ -28957,6 +29011,12 @@ class PeerUser(TLObject):
             'user_id': self.user_id
         }
 
+    def __eq__(self, o):
+        return isinstance(o, type(self)) and self.user_id == o.user_id
+
+    def __hash__(self):
+        return hash((PeerUser.CONSTRUCTOR_ID, self.user_id))
+
     def _bytes(self):
         return b''.join((
             b'"\x17QY',
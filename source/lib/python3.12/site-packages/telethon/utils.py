@@ -179,55 +179,54 @@ def get_input_peer(entity, allow_self=True, check_hash=True):
         else:
             _raise_cast_fail(entity, 'InputPeer')
 
-    if isinstance(entity, types.User):
-        if entity.is_self and allow_self:
-            return types.InputPeerSelf()
-        elif (entity.access_hash is not None and not entity.min) or not check_hash:
-            return types.InputPeerUser(entity.id, entity.access_hash)
-        else:
-            raise TypeError('User without access_hash or min info cannot be input')
+    getter = _INPUT_PEER_GETTERS.get(entity.CONSTRUCTOR_ID)
+    if getter is None:
+        _raise_cast_fail(entity, 'InputPeer')
 
-    if isinstance(entity, (types.Chat, types.ChatEmpty, types.ChatForbidden)):
-        return types.InputPeerChat(entity.id)
+    return getter(entity, allow_self, check_hash)
 
-    if isinstance(entity, types.Channel):
-        if (entity.access_hash is not None and not entity.min) or not check_hash:
-            return types.InputPeerChannel(entity.id, entity.access_hash)
-        else:
-            raise TypeError('Channel without access_hash or min info cannot be input')
-    if isinstance(entity, types.ChannelForbidden):
-        # "channelForbidden are never min", and since their hash is
-        # also not optional, we assume that this truly is the case.
-        return types.InputPeerChannel(entity.id, entity.access_hash)
 
-    if isinstance(entity, types.InputUser):
-        return types.InputPeerUser(entity.user_id, entity.access_hash)
-
-    if isinstance(entity, types.InputChannel):
-        return types.InputPeerChannel(entity.channel_id, entity.access_hash)
-
-    if isinstance(entity, types.InputUserSelf):
+def _input_peer_from_user(entity, allow_self, check_hash):
+    if entity.is_self and allow_self:
         return types.InputPeerSelf()
+    elif (entity.access_hash is not None and not entity.min) or not check_hash:
+        return types.InputPeerUser(entity.id, entity.access_hash)
+    else:
+        raise TypeError('User without access_hash or min info cannot be input')
 
-    if isinstance(entity, types.InputUserFromMessage):
-        return types.InputPeerUserFromMessage(entity.peer, entity.msg_id, entity.user_id)
-
-    if isinstance(entity, types.InputChannelFromMessage):
-        return types.InputPeerChannelFromMessage(entity.peer, entity.msg_id, entity.channel_id)
-
-    if isinstance(entity, types.UserEmpty):
-        return types.InputPeerEmpty()
-
-    if isinstance(entity, types.UserFull):
-        return get_input_peer(entity.user)
-
-    if isinstance(entity, types.ChatFull):
-        return types.InputPeerChat(entity.id)
-
-    if isinstance(entity, types.PeerChat):
-        return types.InputPeerChat(entity.chat_id)
 
-    _raise_cast_fail(entity, 'InputPeer')
+def _input_peer_from_channel(entity, allow_self, check_hash):
+    if (entity.access_hash is not None and not entity.min) or not check_hash:
+        return types.InputPeerChannel(entity.id, entity.access_hash)
+    else:
+        raise TypeError('Channel without access_hash or min info cannot be input')
+
+
+# {CONSTRUCTOR_ID: (entity, allow_self, check_hash) -> InputPeer}
+_INPUT_PEER_GETTERS = {
+    types.User.CONSTRUCTOR_ID: _input_peer_from_user,
+    types.Chat.CONSTRUCTOR_ID: lambda e, *_: types.InputPeerChat(e.id),
+    types.ChatEmpty.CONSTRUCTOR_ID: lambda e, *_: types.InputPeerChat(e.id),
+    types.ChatForbidden.CONSTRUCTOR_ID: lambda e, *_: types.InputPeerChat(e.id),
+    types.Channel.CONSTRUCTOR_ID: _input_peer_from_channel,
+    # "channelForbidden are never min", and since their hash is
+    # also not optional, we assume that this truly is the case.
+    types.ChannelForbidden.CONSTRUCTOR_ID:
+        lambda e, *_: types.InputPeerChannel(e.id, e.access_hash),
+    types.InputUser.CONSTRUCTOR_ID:
+        lambda e, *_: types.InputPeerUser(e.user_id, e.access_hash),
+    types.InputChannel.CONSTRUCTOR_ID:
+        lambda e, *_: types.InputPeerChannel(e.channel_id, e.access_hash),
+    types.InputUserSelf.CONSTRUCTOR_ID: lambda e, *_: types.InputPeerSelf(),
+    types.InputUserFromMessage.CONSTRUCTOR_ID:
+        lambda e, *_: types.InputPeerUserFromMessage(e.peer, e.msg_id, e.user_id),
+    types.InputChannelFromMessage.CONSTRUCTOR_ID:
+        lambda e, *_: types.InputPeerChannelFromMessage(e.peer, e.msg_id, e.channel_id),
+    types.UserEmpty.CONSTRUCTOR_ID: lambda e, *_: types.InputPeerEmpty(),
+    types.UserFull.CONSTRUCTOR_ID: lambda e, *_: get_input_peer(e.user),
+    types.ChatFull.CONSTRUCTOR_ID: lambda e, *_: types.InputPeerChat(e.id),
+    types.PeerChat.CONSTRUCTOR_ID: lambda e, *_: types.InputPeerChat(e.chat_id),
+}
 
 
 def get_input_channel(entity):
@@ -246,16 +245,24 @@ def get_input_channel(entity):
     except AttributeError:
         _raise_cast_fail(entity, 'InputChannel')
 
-    if isinstance(entity, (types.Channel, types.ChannelForbidden)):
-        return types.InputChannel(entity.id, entity.access_hash or 0)
+    getter = _INPUT_CHANNEL_GETTERS.get(entity.CONSTRUCTOR_ID)
+    if getter is None:
+        _raise_cast_fail(entity, 'InputChannel')
 
-    if isinstance(entity, types.InputPeerChannel):
-        return types.InputChannel(entity.channel_id, entity.access_hash)
+    return getter(entity)
 
-    if isinstance(entity, types.InputPeerChannelFromMessage):
-        return types.InputChannelFromMessage(entity.peer, entity.msg_id, entity.channel_id)
 
-    _raise_cast_fail(entity, 'InputChannel')
+# {CONSTRUCTOR_ID: (entity) -> InputChannel}
+_INPUT_CHANNEL_GETTERS = {
+    types.Channel.CONSTRUCTOR_ID:
+        lambda e: types.InputChannel(e.id, e.access_hash or 0),
+    types.ChannelForbidden.CONSTRUCTOR_ID:
+        lambda e: types.InputChannel(e.id, e.access_hash or 0),
+    types.InputPeerChannel.CONSTRUCTOR_ID:
+        lambda e: types.InputChannel(e.channel_id, e.access_hash),
+    types.InputPeerChannelFromMessage.CONSTRUCTOR_ID:
+        lambda e: types.InputChannelFromMessage(e.peer, e.msg_id, e.channel_id),
+}
 
 
 def get_input_user(entity):
@@ -274,28 +281,27 @@ def get_input_user(entity):
     except AttributeError:
         _raise_cast_fail(entity, 'InputUser')
 
-    if isinstance(entity, types.User):
-        if entity.is_self:
-            return types.InputUserSelf()
-        else:
-            return types.InputUser(entity.id, entity.access_hash or 0)
-
-    if isinstance(entity, types.InputPeerSelf):
-        return types.InputUserSelf()
-
-    if isinstance(entity, (types.UserEmpty, types.InputPeerEmpty)):
-        return types.InputUserEmpty()
-
-    if isinstance(entity, types.UserFull):
-        return get_input_user(entity.user)
+    getter = _INPUT_USER_GETTERS.get(entity.CONSTRUCTOR_ID)
+    if getter is None:
+        _raise_cast_fail(entity, 'InputUser')
 
-    if isinstance(entity, types.InputPeerUser):
-        return types.InputUser(entity.user_id, entity.access_hash)
+    return getter(entity)
 
-    if isinstance(entity, types.InputPeerUserFromMessage):
-        return types.InputUserFromMessage(entity.peer, entity.msg_id, entity.user_id)
 
-    _raise_cast_fail(entity, 'InputUser')
+# {CONSTRUCTOR_ID: (entity) -> InputUser}
+_INPUT_USER_GETTERS = {
+    types.User.CONSTRUCTOR_ID:
+        lambda e: types.InputUserSelf() if e.is_self
+        else types.InputUser(e.id, e.access_hash or 0),
+    types.InputPeerSelf.CONSTRUCTOR_ID: lambda e: types.InputUserSelf(),
+    types.UserEmpty.CONSTRUCTOR_ID: lambda e: types.InputUserEmpty(),
+    types.InputPeerEmpty.CONSTRUCTOR_ID: lambda e: types.InputUserEmpty(),
+    types.UserFull.CONSTRUCTOR_ID: lambda e: get_input_user(e.user),
+    types.InputPeerUser.CONSTRUCTOR_ID:
+        lambda e: types.InputUser(e.user_id, e.access_hash),
+    types.InputPeerUserFromMessage.CONSTRUCTOR_ID:
+        lambda e: types.InputUserFromMessage(e.peer, e.msg_id, e.user_id),
+}
 
 
 def get_input_dialog(dialog):
@@ -975,33 +981,58 @@ def get_peer(peer):
             return cls(pid)
         elif peer.SUBCLASS_OF_ID == 0x2d45687:
             return peer
-        elif isinstance(peer, (
-                types.contacts.ResolvedPeer, types.InputNotifyPeer,
-                types.TopPeer, types.Dialog, types.DialogPeer)):
-            return peer.peer
-        elif isinstance(peer, types.ChannelFull):
-            return types.PeerChannel(peer.id)
-        elif isinstance(peer, types.UserEmpty):
-            return types.PeerUser(peer.id)
-        elif isinstance(peer, types.ChatEmpty):
-            return types.PeerChat(peer.id)
+
+        getter = _PEER_GETTERS.get(peer.CONSTRUCTOR_ID)
+        if getter:
+            return getter(peer)
 
         if peer.SUBCLASS_OF_ID in (0x7d7c6f86, 0xd9c7fc18):
             # ChatParticipant, ChannelParticipant
             return types.PeerUser(peer.user_id)
 
         peer = get_input_peer(peer, allow_self=False, check_hash=False)
-        if isinstance(peer, (types.InputPeerUser, types.InputPeerUserFromMessage)):
-            return types.PeerUser(peer.user_id)
-        elif isinstance(peer, types.InputPeerChat):
-            return types.PeerChat(peer.chat_id)
-        elif isinstance(peer, (types.InputPeerChannel, types.InputPeerChannelFromMessage)):
-            return types.PeerChannel(peer.channel_id)
+        getter = _PEER_GETTERS.get(peer.CONSTRUCTOR_ID)
+        if getter:
+            return getter(peer)
     except (AttributeError, TypeError):
         pass
     _raise_cast_fail(peer, 'Peer')
 
 
+# {CONSTRUCTOR_ID: (peer) -> Peer}
+#
+# The entities and input entities in here are those for which going
+# through `get_input_peer(allow_self=False, check_hash=False)` would
+# always produce the same result.
+_PEER_GETTERS = {
+    types.contacts.ResolvedPeer.CONSTRUCTOR_ID: lambda p: p.peer,
+    types.InputNotifyPeer.CONSTRUCTOR_ID: lambda p: p.peer,
+    types.TopPeer.CONSTRUCTOR_ID: lambda p: p.peer,
+    types.Dialog.CONSTRUCTOR_ID: lambda p: p.peer,
+    types.DialogPeer.CONSTRUCTOR_ID: lambda p: p.peer,
+    types.ChannelFull.CONSTRUCTOR_ID: lambda p: types.PeerChannel(p.id),
+    types.UserEmpty.CONSTRUCTOR_ID: lambda p: types.PeerUser(p.id),
+    types.ChatEmpty.CONSTRUCTOR_ID: lambda p: types.PeerChat(p.id),
+
+    types.User.CONSTRUCTOR_ID: lambda p: types.PeerUser(p.id),
+    types.Chat.CONSTRUCTOR_ID: lambda p: types.PeerChat(p.id),
+    types.ChatForbidden.CONSTRUCTOR_ID: lambda p: types.PeerChat(p.id),
+    types.ChatFull.CONSTRUCTOR_ID: lambda p: types.PeerChat(p.id),
+    types.Channel.CONSTRUCTOR_ID: lambda p: types.PeerChannel(p.id),
+    types.ChannelForbidden.CONSTRUCTOR_ID: lambda p: types.PeerChannel(p.id),
+    types.InputUser.CONSTRUCTOR_ID: lambda p: types.PeerUser(p.user_id),
+    types.InputUserFromMessage.CONSTRUCTOR_ID: lambda p: types.PeerUser(p.user_id),
+    types.InputChannel.CONSTRUCTOR_ID: lambda p: types.PeerChannel(p.channel_id),
+    types.InputChannelFromMessage.CONSTRUCTOR_ID: lambda p: types.PeerChannel(p.channel_id),
+
+    types.InputPeerUser.CONSTRUCTOR_ID: lambda p: types.PeerUser(p.user_id),
+    types.InputPeerUserFromMessage.CONSTRUCTOR_ID: lambda p: types.PeerUser(p.user_id),
+    types.InputPeerChat.CONSTRUCTOR_ID: lambda p: types.PeerChat(p.chat_id),
+    types.InputPeerChannel.CONSTRUCTOR_ID: lambda p: types.PeerChannel(p.channel_id),
+    types.InputPeerChannelFromMessage.CONSTRUCTOR_ID: lambda p: types.PeerChannel(p.channel_id),
+}
+
+
 def get_peer_id(peer, add_mark=True):
     """
     Convert the given peer into its marked ID by default.